@@ -3,15 +3,76 @@ Homepage page: card-based journal of Highlight-tagged time entries
 for the current week.
 """
 
+import html
+import threading
+
 import streamlit as st
-from datetime import date, datetime, timedelta
+import numpy as np
+import pandas as pd
+from datetime import date, timedelta
 import os
 
-from src.theme import apply_theme
-from src.data_store import get_connection, get_entries_df
-from src.sync import sync_all, get_sync_status
+from src.data_store import get_reader_conn, get_entries_df, has_highlights_this_week, has_tag
+from src.sync import get_cached_sync_status
+
+# ---------------------------------------------------------------------------
+# Cold-start auto-sync (runs in the background, polled by a fragment)
+# ---------------------------------------------------------------------------
+
+def start_auto_sync() -> dict:
+    """
+    Launch a full sync on a daemon thread and return its shared progress dict.
+    The thread only mutates the dict; the fragment below polls it.
+    """
+    progress = {"msg": "Starting...", "frac": 0.0, "result": None, "error": None,
+                "done": False, "refreshed": False}
+    try:
+        from src.toggl_client import TogglClient
+        from src.sync import sync_all
+        client = TogglClient()
+        client.invalidate_cache()
+    except Exception as e:
+        progress["error"] = str(e)
+        progress["done"] = True
+        return progress
+
+    def on_auto_progress(msg, frac):
+        progress["msg"] = msg
+        progress["frac"] = frac
+
+    def run():
+        try:
+            progress["result"] = sync_all(client, earliest_year=2017, progress_callback=on_auto_progress)
+        except Exception as e:
+            progress["error"] = str(e)
+        progress["done"] = True
+
+    threading.Thread(target=run, name="auto-sync", daemon=True).start()
+    return progress
+
+
+@st.fragment(run_every=1)
+def show_auto_sync_progress(progress: dict):
+    """Poll the background auto-sync once a second and refresh the app when it finishes."""
+    if progress["error"]:
+        st.error(f"Auto-sync failed: {progress['error']}")
+        st.caption("You can try again using the Full Sync button in the sidebar.")
+        return
+    if progress["done"]:
+        result = progress["result"]
+        st.success(
+            f"Auto-sync complete! {result['total_entries']} entries across "
+            f"{result['years_synced']} years."
+        )
+        # Refresh the whole app once; later ticks just keep the message
+        if not progress["refreshed"]:
+            progress["refreshed"] = True
+            st.cache_data.clear()
+            st.rerun()
+        return
+    st.progress(min(progress["frac"], 1.0))
+    st.text(progress["msg"])
 
-apply_theme()
 
 # ---------------------------------------------------------------------------
 # Main content: Homepage -- This Week's Highlights
@@ -19,7 +80,7 @@ apply_theme()
 
 st.title("Homepage")
 
-sync_status = get_sync_status()
+sync_status = get_cached_sync_status()
 
 if not sync_status["has_data"]:
     st.info(
@@ -40,27 +101,11 @@ if not sync_status["has_data"]:
             pass
     if token:
         st.subheader("Auto-syncing your data...")
-        try:
-            from src.toggl_client import TogglClient
-            client = TogglClient()
-            auto_bar = st.progress(0)
-            auto_status = st.empty()
-
-            def on_auto_progress(msg, frac):
-                auto_status.text(msg)
-                auto_bar.progress(min(frac, 1.0))
-
-            import time
-            result = sync_all(client, earliest_year=2017, progress_callback=on_auto_progress)
-            st.success(
-                f"Auto-sync complete! {result['total_entries']} entries across "
-                f"{result['years_synced']} years."
-            )
-            time.sleep(1.5)
-            st.rerun()
-        except Exception as e:
-            st.error(f"Auto-sync failed: {e}")
-            st.caption("You can try again using the Full Sync button in the sidebar.")
+        progress = st.session_state.get("auto_sync_progress")
+        if progress is None:
+            progress = start_auto_sync()
+            st.session_state["auto_sync_progress"] = progress
+        show_auto_sync_progress(progress)
 
     st.stop()
 
@@ -72,18 +117,43 @@ today = date.today()
 iso_year, iso_week, _ = today.isocalendar()
 
 # Compute the Monday-Sunday date range for this ISO week
-monday = datetime.strptime(f"{iso_year}-W{iso_week:02d}-1", "%G-W%V-%u").date()
+monday = date.fromisocalendar(iso_year, iso_week, 1)
 sunday = monday + timedelta(days=6)
 
-conn = get_connection()
-df = get_entries_df(conn, start_date=monday.isoformat(), end_date=sunday.isoformat())
-conn.close()
 
-# Filter to entries that carry the "Highlight" tag
-if not df.empty and "tags_list" in df.columns:
-    highlights = df[df["tags_list"].apply(lambda tags: "Highlight" in tags)].copy()
+# Only the fields the card renderer reads (plus tags for the exact-match check)
+HIGHLIGHT_COLUMNS = ["start", "start_date", "description", "project_name", "duration_hours", "tags"]
+
+
+@st.cache_data(ttl=300, show_spinner=False)
+def load_week_highlights(start_date: str, end_date: str, sync_stamp: tuple) -> pd.DataFrame:
+    """
+    Load Highlight-tagged entries for one week (filtered in SQL).
+    sync_stamp carries the last sync timestamps so a new sync busts the cache.
+    """
+    df = get_entries_df(
+        get_reader_conn(), start_date=start_date, end_date=end_date, tag="Highlight",
+        columns=HIGHLIGHT_COLUMNS,
+    )
+    if df.empty:
+        return df
+    # The entry_tags match ignores case, so keep only the exact "Highlight" tag here
+    return df[has_tag(df, "Highlight")]
+
+
+# Cheap existence probe first so an empty week never materializes a DataFrame
+if has_highlights_this_week(get_reader_conn(), monday.isoformat(), sunday.isoformat()):
+    highlights = load_week_highlights(
+        monday.isoformat(),
+        sunday.isoformat(),
+        (
+            sync_status["last_full_sync"],
+            sync_status["last_incremental_sync"],
+            sync_status["last_enriched_sync"],
+        ),
+    )
 else:
-    highlights = df.iloc[0:0]  # empty DataFrame with same columns
+    highlights = pd.DataFrame()
 
 # ---------------------------------------------------------------------------
 # Render: week header + card journal
@@ -103,36 +173,48 @@ else:
     # Sort chronologically so the journal reads like a timeline
     highlights = highlights.sort_values("start", ascending=True)
 
-    for _, row in highlights.iterrows():
-        # Parse start datetime for display
-        try:
-            start_dt = datetime.fromisoformat(str(row["start"]).replace("Z", "+00:00"))
-            day_label = start_dt.strftime("%a, %b %d")      # e.g. "Mon, Feb 23"
-            time_label = start_dt.strftime("%H:%M")          # e.g. "09:15"
-        except (ValueError, TypeError):
-            day_label = str(row.get("start_date", ""))
-            time_label = ""
-
-        description = row.get("description") or "(no description)"
-        project = row.get("project_name") or ""
-        hours = row.get("duration_hours", 0)
-
-        # Format the duration as a readable string
-        if hours >= 1:
-            dur_str = f"{hours:.1f}h"
-        else:
-            dur_str = f"{int(hours * 60)}m"
+    # Build display labels for the whole column at once ('start' is already
+    # parsed to wall-clock datetimes by get_entries_df)
+    day_label = highlights["start"].dt.strftime("%a, %b %d")      # e.g. "Mon, Feb 23"
+    time_label = highlights["start"].dt.strftime("%H:%M")          # e.g. "09:15"
+
+    # Format the duration as a readable string
+    hours = highlights["duration_hours"].fillna(0)
+    dur_str = np.where(
+        hours >= 1,
+        hours.round(1).astype(str) + "h",
+        (hours * 60).astype(int).astype(str) + "m",
+    )
+
+    # assign() returns a new frame instead of writing into the cached result.
+    # Unparseable starts fall back to the stored date with no time.
+    highlights = highlights.assign(
+        day_label=day_label.fillna(highlights["start_date"].fillna("")),
+        time_label=time_label.fillna(""),
+        dur_str=dur_str,
+    )
+
+    records = highlights[
+        ["description", "project_name", "day_label", "time_label", "dur_str"]
+    ].to_dict("records")
+
+    cards = []
+    for row in records:
+        description = row["description"] or "(no description)"
 
         # Build the metadata line: day . project . duration . time
-        meta_parts = [day_label]
-        if project:
-            meta_parts.append(project)
-        meta_parts.append(dur_str)
-        if time_label:
-            meta_parts.append(time_label)
+        meta_parts = [row["day_label"]]
+        if row["project_name"]:
+            meta_parts.append(row["project_name"])
+        meta_parts.append(row["dur_str"])
+        if row["time_label"]:
+            meta_parts.append(row["time_label"])
         meta_line = "  \u00b7  ".join(meta_parts)
 
-        # Render a card using a bordered container
-        with st.container(border=True):
-            st.markdown(f"**{description}**")
-            st.caption(meta_line)
+        cards.append(
+            f'<div class="highlight-card"><b>{html.escape(description)}</b>'
+            f'<br><small>{html.escape(meta_line)}</small></div>'
+        )
+
+    # Emit every card in one element (styled by .highlight-card in the theme)
+    st.markdown("\n".join(cards), unsafe_allow_html=True)
@@ -4,26 +4,213 @@ Cyberpunk neon theme applied to all visualizations.
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
+from plotly.subplots import make_subplots
 from datetime import date
 
-from src.data_store import get_connection, get_entries_df, get_available_years
+from src.data_store import (
+    get_reader_conn, get_entries_df, get_available_years, categorize_columns,
+    get_overview, get_project_hours, get_tag_hours, get_daily_hours, get_monthly_hours,
+    get_description_stats,
+)
 
 from src.theme import (
-    apply_theme, neon_chart_layout, COLORS, NEON_SEQUENCE,
+    neon_chart_layout, COLORS, NEON_SEQUENCE,
     SCALE_CYAN_MAGENTA, SCALE_NEON_HEATMAP, SCALE_MAGENTA_FIRE,
 )
-apply_theme()
 
 st.title("Dashboard")
 
-conn = get_connection()
-years = get_available_years(conn)
+# ---------------------------------------------------------------------------
+# Cached loaders and aggregations
+#
+# Keyed by the filter values (year, start_date, end_date) rather than by a
+# DataFrame, so widget reruns become cache lookups. The sidebar clears them
+# with st.cache_data.clear() after every sync.
+# ---------------------------------------------------------------------------
+
+@st.cache_data(show_spinner=False)
+def load_years() -> list[int]:
+    return get_available_years(get_reader_conn())
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def load_entries(year: int | None, start_date: str | None, end_date: str | None) -> pd.DataFrame:
+    df = get_entries_df(get_reader_conn(), year=year, start_date=start_date, end_date=end_date)
+    return categorize_columns(df)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_overview(year: int | None, start_date: str | None, end_date: str | None) -> dict:
+    # One SQL rollup; the full entry frame is only loaded by sections that need rows
+    return get_overview(get_reader_conn(), year, start_date, end_date)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_project_hours(year: int | None, start_date: str | None, end_date: str | None) -> pd.DataFrame:
+    project_hours = get_project_hours(get_reader_conn(), year, start_date, end_date)[["project_name", "hours"]]
+    project_hours.columns = ["Project", "Hours"]
+    project_hours["Project"] = project_hours["Project"].replace("", "(No Project)")
+    return project_hours
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_tag_hours(year: int | None, start_date: str | None, end_date: str | None) -> pd.DataFrame:
+    tag_hours = get_tag_hours(get_reader_conn(), year, start_date, end_date)[["tag", "hours"]]
+    tag_hours.columns = ["Tag", "Hours"]
+    return tag_hours
+
+
+def top_k(df: pd.DataFrame, col: str, k: int) -> pd.DataFrame:
+    """
+    The k rows with the largest `col`, largest first. np.argpartition finds
+    them in O(n) and only those k are sorted, instead of sorting every row.
+    """
+    values = df[col].to_numpy()
+    if len(values) <= k:
+        return df.sort_values(col, ascending=False).reset_index(drop=True)
+    idx = np.argpartition(-values, k)[:k]
+    idx = idx[np.argsort(-values[idx], kind="stable")]
+    return df.iloc[idx].reset_index(drop=True)
+
+
+def _group_hours(keys: pd.Series, hours: pd.Series, drop_blank: bool = False,
+                 k: int | None = None) -> pd.DataFrame:
+    """
+    Entry count and summed hours per distinct key, most hours first.
+    One factorize plus two np.bincount passes instead of a pandas groupby/agg.
+    NaN keys are always dropped; "" keys too when drop_blank is set.
+    Pass k to keep only the k largest groups. Columns: key, count, hours.
+    """
+    # Unenriched syncs leave client/task columns entirely NULL; skip the passes
+    if not keys.notna().any():
+        return pd.DataFrame({"key": pd.Series(dtype=object), "count": pd.Series(dtype=np.int64),
+                             "hours": pd.Series(dtype=np.float64)})
+    codes, uniques = pd.factorize(keys, sort=False)
+    valid = codes >= 0
+    if drop_blank:
+        valid &= (keys != "").to_numpy()
+    codes = codes[valid]
+    totals = np.bincount(codes, weights=hours.to_numpy()[valid], minlength=len(uniques))
+    counts = np.bincount(codes, minlength=len(uniques))
+    grouped = pd.DataFrame({"key": np.asarray(uniques, dtype=object), "count": counts, "hours": totals})
+    # Keys that only appeared on dropped rows leave zero-count slots
+    grouped = grouped[grouped["count"] > 0]
+    if k is not None:
+        return top_k(grouped, "hours", k)
+    return grouped.sort_values("hours", ascending=False).reset_index(drop=True)
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_client_hours(year: int | None, start_date: str | None, end_date: str | None) -> pd.DataFrame | None:
+    """Top 20 clients by hours, or None when the frame has no client column."""
+    df = load_entries(year, start_date, end_date)
+    if "client_name" not in df.columns:
+        return None
+    client_hours = _group_hours(df["client_name"], df["duration_hours"], k=20)[["key", "hours"]]
+    client_hours.columns = ["Client", "Hours"]
+    client_hours["Client"] = client_hours["Client"].replace("", "(No Client)")
+    return client_hours
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_task_hours(year: int | None, start_date: str | None, end_date: str | None) -> pd.DataFrame | None:
+    """Top 20 tasks by hours, or None when the frame has no task column."""
+    df = load_entries(year, start_date, end_date)
+    if "task_name" not in df.columns:
+        return None
+    task_hours = _group_hours(df["task_name"], df["duration_hours"], drop_blank=True, k=20)[["key", "hours"]]
+    task_hours.columns = ["Task", "Hours"]
+    return task_hours
+
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def compute_project_detail(year: int | None, start_date: str | None, end_date: str | None,
+                           project: str) -> dict | None:
+    """Metrics, top descriptions and linked tasks for one project, or None if it has no entries."""
+    df = load_entries(year, start_date, end_date)
+    proj_df = df[df["project_name"] == project]
+    if proj_df.empty:
+        return None
+
+    top_desc = _group_hours(proj_df["description"], proj_df["duration_hours"], drop_blank=True, k=15)
+    top_desc.columns = ["Description", "Entries", "Hours"]
+
+    task_summary = None
+    if "task_name" in proj_df.columns:
+        proj_tasks = _group_hours(proj_df["task_name"], proj_df["duration_hours"], drop_blank=True)
+        if not proj_tasks.empty:
+            task_summary = proj_tasks[["key", "hours"]]
+            task_summary.columns = ["Task", "Hours"]
+
+    client = None
+    if "client_name" in proj_df.columns:
+        client = proj_df["client_name"].iloc[0]
+
+    return {
+        "hours": proj_df["duration_hours"].sum(),
+        "entries": len(proj_df),
+        "first_date": proj_df["start_date"].min(),
+        "last_date": proj_df["start_date"].max(),
+        "top_desc": top_desc,
+        "task_summary": task_summary,
+        "client": client,
+    }
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_monthly(year: int | None, start_date: str | None, end_date: str | None) -> pd.DataFrame:
+    monthly = get_monthly_hours(get_reader_conn(), year, start_date, end_date)
+    monthly.columns = ["Month", "Hours"]
+    return monthly
+
+
+def _iso_calendar(days: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    ISO (year, week, weekday Mon=0) for an array of days since 1970-01-01,
+    using integer math only. An ISO week belongs to the year of its Thursday.
+    """
+    weekday = (days + 3) % 7                       # 1970-01-01 was a Thursday
+    thursday = days - weekday + 3
+    iso_year = thursday.astype("datetime64[D]").astype("datetime64[Y]").astype(np.int64) + 1970
+    jan1 = (iso_year - 1970).astype("datetime64[Y]").astype("datetime64[D]").astype(np.int64)
+    week = (thursday - jan1) // 7 + 1
+    return iso_year, week, weekday
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_heatmaps(year: int | None, start_date: str | None,
+                     end_date: str | None) -> tuple[list[int], np.ndarray]:
+    """
+    Daily hours binned into one 7 x 53 weekday-by-ISO-week grid per ISO year.
+    Returns (iso_years ascending, grids shaped (len(iso_years), 7, 53)). ISO
+    years keep Dec 31 in week 1 from colliding with the previous January.
+    All 53 weeks are always present so empty weeks render as dark cells.
+    """
+    daily = get_daily_hours(get_reader_conn(), year, start_date, end_date)
+    days = np.array(daily["start_date"], dtype="datetime64[D]").astype(np.int64)
+    iso_year, week, weekday = _iso_calendar(days)
+
+    years, year_idx = np.unique(iso_year, return_inverse=True)
+    grids = np.zeros((len(years), 7, 53), dtype=np.float32)
+    np.add.at(grids, (year_idx, weekday, week - 1), daily["hours"].to_numpy())
+    return [int(y) for y in years], grids
+
+
+@st.cache_data(show_spinner=False, max_entries=8)
+def compute_desc_counts(year: int | None, start_date: str | None, end_date: str | None) -> pd.DataFrame:
+    desc_counts = get_description_stats(get_reader_conn(), year, start_date, end_date, limit=30)
+    desc_counts.columns = ["Description", "Entries", "Total Hours"]
+    desc_counts["Avg Hours"] = desc_counts["Total Hours"] / desc_counts["Entries"]
+    return desc_counts
+
+
+years = load_years()
 
 if not years:
-    conn.close()
     st.warning("No data available. Please run a sync from the home page.")
     st.stop()
 
@@ -39,21 +226,21 @@ selected_year = max(years)
 if view_mode == "Single Year":
     _sel = st.sidebar.selectbox("Year", sorted(years, reverse=True))
     selected_year = _sel if _sel is not None else selected_year
-    df = get_entries_df(conn, year=selected_year)
+    filters = (selected_year, None, None)
     title_suffix = str(selected_year)
 elif view_mode == "All Time":
-    df = get_entries_df(conn)
+    filters = (None, None, None)
     title_suffix = f"{min(years)}-{max(years)}"
 else:
     col1, col2 = st.sidebar.columns(2)
     start = col1.date_input("From", date(max(years), 1, 1))
     end = col2.date_input("To", date.today())
-    df = get_entries_df(conn, start_date=start.isoformat(), end_date=end.isoformat())
+    filters = (None, start.isoformat(), end.isoformat())
     title_suffix = f"{start} to {end}"
 
-conn.close()
+overview = compute_overview(*filters)
 
-if df.empty:
+if overview["total_entries"] == 0:
     st.info(f"No entries found for {title_suffix}.")
     st.stop()
 
@@ -63,10 +250,10 @@ if df.empty:
 
 st.subheader(f"Overview: {title_suffix}")
 
-total_hours = df["duration_hours"].sum()
-total_entries = len(df)
-unique_projects = df["project_name"].nunique()
-unique_days = df["start_date"].nunique()
+total_hours = overview["total_hours"]
+total_entries = overview["total_entries"]
+unique_projects = overview["unique_projects"]
+unique_days = overview["unique_days"]
 avg_hours_per_day = total_hours / unique_days if unique_days > 0 else 0
 
 col1, col2, col3, col4, col5 = st.columns(5)
@@ -84,14 +271,7 @@ st.divider()
 
 st.subheader("Time by Project")
 
-project_hours = (
-    df.groupby("project_name")["duration_hours"]
-    .sum()
-    .reset_index()
-    .sort_values("duration_hours", ascending=False)
-)
-project_hours.columns = ["Project", "Hours"]
-project_hours["Project"] = project_hours["Project"].replace("", "(No Project)")
+project_hours = compute_project_hours(*filters)
 
 col_pie, col_bar = st.columns(2)
 
@@ -148,47 +328,35 @@ st.divider()
 
 st.subheader("Time by Tag")
 
-if "tags_list" in df.columns:
-    tags_exploded = df.explode("tags_list")
-    tags_exploded = tags_exploded[tags_exploded["tags_list"].notna() & (tags_exploded["tags_list"] != "")]
+tag_hours = compute_tag_hours(*filters)
 
-    if not tags_exploded.empty:
-        tag_hours = (
-            tags_exploded.groupby("tags_list")["duration_hours"]
-            .sum()
-            .reset_index()
-            .sort_values("duration_hours", ascending=False)
-        )
-        tag_hours.columns = ["Tag", "Hours"]
-
-        fig = px.bar(
-            tag_hours.head(25),
-            x="Hours",
-            y="Tag",
-            orientation="h",
-            title="Top 25 Tags (hours)",
-            color="Hours",
-            color_continuous_scale=SCALE_MAGENTA_FIRE,
-        )
-        fig.update_traces(
-            marker_line_color=COLORS["magenta"],
-            marker_line_width=0.5,
-        )
-        neon_chart_layout(fig, height=500)
-        fig.update_layout(
-            yaxis=dict(autorange="reversed"),
-            showlegend=False,
-            coloraxis_colorbar=dict(
-                title="Hours",
-                tickfont=dict(color=COLORS["text_muted"]),
-                title_font=dict(color=COLORS["text_muted"]),
-            ),
-        )
-        st.plotly_chart(fig, use_container_width=True)
-    else:
-        st.caption("No tagged entries found in this period.")
+if not tag_hours.empty:
+    fig = px.bar(
+        tag_hours.head(25),
+        x="Hours",
+        y="Tag",
+        orientation="h",
+        title="Top 25 Tags (hours)",
+        color="Hours",
+        color_continuous_scale=SCALE_MAGENTA_FIRE,
+    )
+    fig.update_traces(
+        marker_line_color=COLORS["magenta"],
+        marker_line_width=0.5,
+    )
+    neon_chart_layout(fig, height=500)
+    fig.update_layout(
+        yaxis=dict(autorange="reversed"),
+        showlegend=False,
+        coloraxis_colorbar=dict(
+            title="Hours",
+            tickfont=dict(color=COLORS["text_muted"]),
+            title_font=dict(color=COLORS["text_muted"]),
+        ),
+    )
+    st.plotly_chart(fig, use_container_width=True)
 else:
-    st.caption("No tag data available.")
+    st.caption("No tagged entries found in this period.")
 
 st.divider()
 
@@ -198,19 +366,12 @@ st.divider()
 
 st.subheader("Time by Client")
 
-if "client_name" in df.columns:
-    client_hours = (
-        df.groupby("client_name")["duration_hours"]
-        .sum()
-        .reset_index()
-        .sort_values("duration_hours", ascending=False)
-    )
-    client_hours.columns = ["Client", "Hours"]
-    client_hours["Client"] = client_hours["Client"].replace("", "(No Client)")
+client_hours = compute_client_hours(*filters)
 
+if client_hours is not None:
     if not client_hours.empty:
         fig = px.bar(
-            client_hours.head(20),
+            client_hours,
             x="Hours",
             y="Client",
             orientation="h",
@@ -244,20 +405,14 @@ st.divider()
 # Task breakdown
 # ---------------------------------------------------------------------------
 
-if "task_name" in df.columns:
-    tasks_df = df[df["task_name"].notna() & (df["task_name"] != "")]
-    if not tasks_df.empty:
+task_hours = compute_task_hours(*filters)
+
+if task_hours is not None:
+    if not task_hours.empty:
         st.subheader("Time by Task")
-        task_hours = (
-            tasks_df.groupby("task_name")["duration_hours"]
-            .sum()
-            .reset_index()
-            .sort_values("duration_hours", ascending=False)
-        )
-        task_hours.columns = ["Task", "Hours"]
 
         fig = px.bar(
-            task_hours.head(20),
+            task_hours,
             x="Hours",
             y="Task",
             orientation="h",
@@ -296,50 +451,32 @@ selected_project = st.selectbox("Select a project", project_list, index=0)
 
 if selected_project:
     proj_filter = "" if selected_project == "(No Project)" else selected_project
-    proj_df = df[df["project_name"] == proj_filter]
-    if not proj_df.empty:
+    detail = compute_project_detail(*filters, proj_filter)
+    if detail is not None:
         col_m1, col_m2, col_m3 = st.columns(3)
-        col_m1.metric("Total Hours", f"{proj_df['duration_hours'].sum():,.1f}")
-        col_m2.metric("Entries", f"{len(proj_df):,}")
-        col_m3.metric("Date Range", f"{proj_df['start_date'].min()} to {proj_df['start_date'].max()}")
+        col_m1.metric("Total Hours", f"{detail['hours']:,.1f}")
+        col_m2.metric("Entries", f"{detail['entries']:,}")
+        col_m3.metric("Date Range", f"{detail['first_date']} to {detail['last_date']}")
 
         with st.expander("Top Descriptions", expanded=True):
-            top_desc = (
-                proj_df[proj_df["description"].notna() & (proj_df["description"] != "")]
-                .groupby("description")
-                .agg(count=("id", "count"), hours=("duration_hours", "sum"))
-                .sort_values("hours", ascending=False)
-                .head(15)
-                .reset_index()
-            )
-            top_desc.columns = ["Description", "Entries", "Hours"]
             st.dataframe(
-                top_desc.style.format({"Hours": "{:.1f}"}),
+                detail["top_desc"],
                 use_container_width=True,
                 hide_index=True,
+                column_config={"Hours": st.column_config.NumberColumn(format="%.1f")},
             )
 
-        if "task_name" in proj_df.columns:
-            proj_tasks = proj_df[proj_df["task_name"].notna() & (proj_df["task_name"] != "")]
-            if not proj_tasks.empty:
-                with st.expander("Linked Tasks"):
-                    task_summary = (
-                        proj_tasks.groupby("task_name")["duration_hours"]
-                        .sum()
-                        .reset_index()
-                        .sort_values("duration_hours", ascending=False)
-                    )
-                    task_summary.columns = ["Task", "Hours"]
-                    st.dataframe(
-                        task_summary.style.format({"Hours": "{:.1f}"}),
-                        use_container_width=True,
-                        hide_index=True,
-                    )
-
-        if "client_name" in proj_df.columns:
-            client = proj_df["client_name"].iloc[0]
-            if client:
-                st.caption(f"Client: {client}")
+        if detail["task_summary"] is not None:
+            with st.expander("Linked Tasks"):
+                st.dataframe(
+                    detail["task_summary"],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={"Hours": st.column_config.NumberColumn(format="%.1f")},
+                )
+
+        if detail["client"]:
+            st.caption(f"Client: {detail['client']}")
 
 st.divider()
 
@@ -349,9 +486,7 @@ st.divider()
 
 st.subheader("Monthly Trend")
 
-df["year_month"] = df["start_date"].str[:7]
-monthly = df.groupby("year_month")["duration_hours"].sum().reset_index()
-monthly.columns = ["Month", "Hours"]
+monthly = compute_monthly(*filters)
 
 fig = px.line(
     monthly,
@@ -390,63 +525,74 @@ st.divider()
 
 st.subheader("Daily Activity Heatmap")
 
-daily = df.groupby("start_date")["duration_hours"].sum().reset_index()
-daily.columns = ["Date", "Hours"]
-daily["Date"] = pd.to_datetime(daily["Date"])
-daily["Weekday"] = daily["Date"].dt.dayofweek
-# Use ISO year (not calendar year) so Dec 31 in ISO week 1 groups with the
-# correct year -- prevents week-1 data collisions in the heatmap pivot.
-iso_cal = daily["Date"].dt.isocalendar()
-daily["Week"] = iso_cal.week.astype(int)
-daily["Year"] = iso_cal.year.astype(int)
+heat_years, heat_grids = compute_heatmaps(*filters)
 
 day_labels = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+week_labels = [f"W{w}" for w in range(1, 54)]
 
 
-def _render_heatmap(data: pd.DataFrame, title: str, height: int = 220):
-    """Render a single GitHub-style heatmap for the given daily data."""
-    pivot = data.pivot_table(
-        index="Weekday", columns="Week", values="Hours", aggfunc="sum"
-    )
-    # Fill all 53 ISO weeks so empty weeks render as dark cells, not gaps
-    pivot = pivot.reindex(columns=range(1, 54), fill_value=0).fillna(0)
-    # Ensure all 7 weekdays are present
-    pivot = pivot.reindex(index=range(7), fill_value=0).fillna(0)
-
-    fig = go.Figure(data=go.Heatmap(
-        z=pivot.values,
-        x=[f"W{w}" for w in pivot.columns],
-        y=[day_labels[i] for i in pivot.index],
-        colorscale=SCALE_NEON_HEATMAP,
+def _heatmap_trace(z: np.ndarray, name: str) -> go.Heatmap:
+    """One GitHub-style heatmap trace for a 7 x 53 hours grid, on the shared color axis."""
+    return go.Heatmap(
+        z=z,
+        x=week_labels,
+        y=day_labels,
+        name=name,
+        coloraxis="coloraxis",
         hovertemplate="Week %{x}<br>%{y}<br>%{z:.1f} hours<extra></extra>",
         xgap=2,
         ygap=2,
-    ))
-    neon_chart_layout(fig, height=height)
+    )
+
+
+@st.cache_data(show_spinner=False)
+def _heatmap_figure(grids: np.ndarray, titles: list[str], row_height: int) -> dict:
+    """
+    Build every heatmap as one figure dict: a single chart for one grid,
+    otherwise one subplot row per grid. Cached on the grid contents, so
+    All-Time reruns skip rebuilding and the browser gets a single chart.
+    """
+    if len(grids) == 1:
+        fig = go.Figure(data=_heatmap_trace(grids[0], titles[0]))
+        fig.update_layout(title=titles[0], xaxis=dict(side="top"))
+    else:
+        fig = make_subplots(
+            rows=len(grids), cols=1, subplot_titles=titles, vertical_spacing=0.03,
+        )
+        for i, z in enumerate(grids):
+            fig.add_trace(_heatmap_trace(z, titles[i]), row=i + 1, col=1)
+        # Week labels only above the top row; the rest would collide with titles
+        fig.update_xaxes(showticklabels=False)
+        fig.update_xaxes(showticklabels=True, side="top", row=1, col=1)
+
+    neon_chart_layout(fig, height=row_height * len(grids))
+    fig.update_yaxes(autorange="reversed")
     fig.update_layout(
-        title=title,
-        yaxis=dict(autorange="reversed"),
-        xaxis=dict(side="top"),
-        coloraxis_colorbar=dict(
-            title="Hours",
-            tickfont=dict(color=COLORS["text_muted"]),
-            title_font=dict(color=COLORS["text_muted"]),
+        coloraxis=dict(
+            colorscale=SCALE_NEON_HEATMAP,
+            colorbar=dict(
+                title="Hours",
+                tickfont=dict(color=COLORS["text_muted"]),
+                title_font=dict(color=COLORS["text_muted"]),
+            ),
         ),
     )
-    st.plotly_chart(fig, use_container_width=True)
+    return fig.to_plotly_json()
 
 
 if view_mode == "Single Year":
-    heatmap_data = daily[daily["Year"] == selected_year]
-    if not heatmap_data.empty:
-        _render_heatmap(heatmap_data, f"Daily Hours Tracked — {selected_year}")
-else:
-    # Show a small-multiples heatmap: one row per year, most recent first
-    heatmap_years = sorted(daily["Year"].unique(), reverse=True)
-    for yr in heatmap_years:
-        yr_data = daily[daily["Year"] == yr]
-        if not yr_data.empty:
-            _render_heatmap(yr_data, f"{yr}", height=180)
+    if selected_year in heat_years:
+        i = heat_years.index(selected_year)
+        st.plotly_chart(
+            _heatmap_figure(heat_grids[i:i + 1], [f"Daily Hours Tracked — {selected_year}"], 220),
+            use_container_width=True,
+        )
+elif heat_years:
+    # Small multiples in one figure: one row per year, most recent first
+    st.plotly_chart(
+        _heatmap_figure(heat_grids[::-1], [str(y) for y in reversed(heat_years)], 180),
+        use_container_width=True,
+    )
 
 st.divider()
 
@@ -456,19 +602,15 @@ st.divider()
 
 st.subheader("Most Common Activities")
 
-desc_counts = (
-    df[df["description"].notna() & (df["description"] != "")]
-    .groupby("description")
-    .agg(count=("id", "count"), total_hours=("duration_hours", "sum"))
-    .reset_index()
-    .sort_values("total_hours", ascending=False)
-    .head(30)
-)
-desc_counts.columns = ["Description", "Entries", "Total Hours"]
-desc_counts["Avg Hours"] = desc_counts["Total Hours"] / desc_counts["Entries"]
+desc_counts = compute_desc_counts(*filters)
 
 st.dataframe(
-    desc_counts.style.format({"Total Hours": "{:.1f}", "Avg Hours": "{:.2f}"}),
+    desc_counts,
     use_container_width=True,
     hide_index=True,
+    # Formatted in the browser, so no Styler is built and columns still sort numerically
+    column_config={
+        "Total Hours": st.column_config.NumberColumn(format="%.1f"),
+        "Avg Hours": st.column_config.NumberColumn(format="%.2f"),
+    },
 )
@@ -13,22 +13,21 @@ import plotly.graph_objects as go
 from datetime import date, datetime, timedelta
 
 from src.data_store import (
-    get_connection, get_entries_for_date_across_years,
-    get_entries_for_week_across_years, get_entries_df, get_available_years,
+    get_reader_conn, get_entries_for_date_across_years,
+    get_entries_for_week_across_years, get_available_years, categorize_columns,
+    get_monthly_totals, get_project_hours, get_overview,
 )
 from src.theme import (
-    apply_theme, neon_chart_layout, COLORS, NEON_SEQUENCE,
+    neon_chart_layout, COLORS, NEON_SEQUENCE,
     SCALE_CYAN_MONO, SCALE_MAGENTA_FIRE,
 )
 
-apply_theme()
 st.title("Retrospect")
 
-conn = get_connection()
+conn = get_reader_conn()
 years = get_available_years(conn)
 
 if not years:
-    conn.close()
     st.warning("No data available. Please run a sync from the home page.")
     st.stop()
 
@@ -63,7 +62,7 @@ with tab_day:
     else:
         # Summary: hours per year for this date
         year_summary = (
-            df_day.groupby("start_year")
+            df_day.groupby("start_year", sort=False)
             .agg(
                 hours=("duration_hours", "sum"),
                 entries=("id", "count"),
@@ -117,10 +116,11 @@ with tab_day:
                     if has_tasks.any():
                         display_cols.insert(4, "task_name")
                         rename_map["task_name"] = "Task"
-                display_df = year_entries[display_cols].copy()
-                display_df = display_df.rename(columns=rename_map)
-                display_df["Start Time"] = pd.to_datetime(display_df["Start Time"]).dt.strftime("%H:%M")
-                display_df["Hours"] = display_df["Hours"].round(2)
+                # assign() returns a new frame, so the filtered slice needs no .copy()
+                display_df = year_entries[display_cols].rename(columns=rename_map).assign(**{
+                    "Start Time": lambda d: d["Start Time"].dt.strftime("%H:%M"),
+                    "Hours": lambda d: d["Hours"].round(2),
+                })
                 st.dataframe(display_df, use_container_width=True, hide_index=True)
 
 # ===========================================================================
@@ -141,14 +141,16 @@ with tab_week:
         help="Compare the same week number across all years",
     )
 
-    df_week = get_entries_for_week_across_years(conn, selected_week)
+    df_week = categorize_columns(
+        get_entries_for_week_across_years(conn, selected_week), columns=("project_name",)
+    )
 
     if df_week.empty:
         st.info(f"No entries found for week {selected_week} in any year.")
     else:
         # Hours per year for this week
         week_by_year = (
-            df_week.groupby("start_year")["duration_hours"]
+            df_week.groupby("start_year", sort=False)["duration_hours"]
             .sum()
             .reset_index()
         )
@@ -175,14 +177,14 @@ with tab_week:
 
         # Project breakdown per year for this week
         week_projects = (
-            df_week.groupby(["start_year", "project_name"])["duration_hours"]
+            df_week.groupby(["start_year", "project_name"], sort=False, observed=True)["duration_hours"]
             .sum()
             .reset_index()
         )
         week_projects = week_projects.rename(columns={
             "start_year": "Year", "project_name": "Project", "duration_hours": "Hours",
         })
-        week_projects["Project"] = week_projects["Project"].replace("", "(No Project)")
+        week_projects["Project"] = week_projects["Project"].astype(object).replace("", "(No Project)")
 
         fig2 = px.bar(
             week_projects,
@@ -210,18 +212,16 @@ with tab_compare:
         default_b = min(1, len(years) - 1)
         year_b = st.selectbox("Year B", sorted(years, reverse=True), index=default_b, key="year_b")
 
-    df_a = get_entries_df(conn, year=year_a)
-    df_b = get_entries_df(conn, year=year_b)
+    # Every block below is a per-year SQL aggregate; no row-level frames are loaded
+    overview_a = get_overview(conn, year=year_a)
+    overview_b = get_overview(conn, year=year_b)
 
-    if df_a.empty and df_b.empty:
+    if overview_a["total_entries"] == 0 and overview_b["total_entries"] == 0:
         st.info("No data for the selected years.")
     else:
         # Monthly comparison
-        df_a["month"] = df_a["start_month"]
-        df_b["month"] = df_b["start_month"]
-
-        monthly_a = df_a.groupby("month")["duration_hours"].sum().reindex(range(1, 13), fill_value=0)
-        monthly_b = df_b.groupby("month")["duration_hours"].sum().reindex(range(1, 13), fill_value=0)
+        monthly_a = get_monthly_totals(conn, year_a)
+        monthly_b = get_monthly_totals(conn, year_b)
 
         month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
                        "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
@@ -248,24 +248,29 @@ with tab_compare:
         # Project comparison
         st.markdown("#### Project Hours Comparison")
 
-        proj_a = df_a.groupby("project_name")["duration_hours"].sum().reset_index()
-        proj_a = proj_a.rename(columns={"project_name": "Project", "duration_hours": f"{year_a} Hours"})
-        proj_b = df_b.groupby("project_name")["duration_hours"].sum().reset_index()
-        proj_b = proj_b.rename(columns={"project_name": "Project", "duration_hours": f"{year_b} Hours"})
+        # Align the two per-project series on the union of names; no merge needed
+        proj_a = get_project_hours(conn, year=year_a).set_index("project_name")["hours"]
+        proj_b = get_project_hours(conn, year=year_b).set_index("project_name")["hours"]
+        projects = proj_a.index.union(proj_b.index)
 
-        proj_compare = pd.merge(proj_a, proj_b, on="Project", how="outer").fillna(0)
+        proj_compare = pd.DataFrame({
+            "Project": projects.fillna("").to_numpy(dtype=object),
+            f"{year_a} Hours": proj_a.reindex(projects, fill_value=0).to_numpy(),
+            f"{year_b} Hours": proj_b.reindex(projects, fill_value=0).to_numpy(),
+        })
         proj_compare["Project"] = proj_compare["Project"].replace("", "(No Project)")
         proj_compare["Difference"] = proj_compare[f"{year_a} Hours"] - proj_compare[f"{year_b} Hours"]
         proj_compare = proj_compare.sort_values(f"{year_a} Hours", ascending=False)
 
         st.dataframe(
-            proj_compare.style.format({
-                f"{year_a} Hours": "{:.1f}",
-                f"{year_b} Hours": "{:.1f}",
-                "Difference": "{:+.1f}",
-            }),
+            proj_compare,
             use_container_width=True,
             hide_index=True,
+            column_config={
+                f"{year_a} Hours": st.column_config.NumberColumn(format="%.1f"),
+                f"{year_b} Hours": st.column_config.NumberColumn(format="%.1f"),
+                "Difference": st.column_config.NumberColumn(format="%+.1f"),
+            },
         )
 
         # Summary stats comparison
@@ -275,14 +280,12 @@ with tab_compare:
             "Metric": ["Total Hours", "Total Entries", "Active Days", "Unique Projects", "Avg Hours/Day"],
         }
 
-        for label, df_x, year_x in [(str(year_a), df_a, year_a), (str(year_b), df_b, year_b)]:
-            total_h = df_x["duration_hours"].sum()
-            total_e = len(df_x)
-            active_d = df_x["start_date"].nunique()
-            unique_p = df_x["project_name"].nunique()
+        for label, overview in [(str(year_a), overview_a), (str(year_b), overview_b)]:
+            total_h = overview["total_hours"]
+            total_e = overview["total_entries"]
+            active_d = overview["unique_days"]
+            unique_p = overview["unique_projects"]
             avg_h = total_h / active_d if active_d > 0 else 0
             stats_data[label] = [f"{total_h:.1f}", str(total_e), str(active_d), str(unique_p), f"{avg_h:.1f}"]
 
         st.dataframe(pd.DataFrame(stats_data), use_container_width=True, hide_index=True)
-
-conn.close()
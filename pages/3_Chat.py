@@ -7,16 +7,11 @@ Designed with a clear extension point for AI API integration later.
 
 import streamlit as st
 from src.queries import answer_question
-from src.data_store import get_connection, get_available_years
-
-from src.theme import apply_theme
-apply_theme()
+from src.data_store import get_reader_conn, get_available_years
 
 st.title("Chat with Your Time Data")
 
-conn = get_connection()
-years = get_available_years(conn)
-conn.close()
+years = get_available_years(get_reader_conn())
 
 if not years:
     st.warning("No data available. Please run a sync from the home page.")
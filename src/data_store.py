@@ -12,40 +12,323 @@ data loss on first run after this change.
 import sqlite3
 import json
 import os
+import threading
+import weakref
 from contextlib import contextmanager
-from datetime import date, datetime, timedelta
+from functools import lru_cache
+from datetime import date, timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
+_json_loads = orjson.loads if _HAS_ORJSON else json.loads
+
 DATA_DIR = Path(__file__).parent.parent / "data"
 DB_PATH = DATA_DIR / "toggl.db"
 
 
-def _attach_tags_list(df: pd.DataFrame) -> None:
-    """Decode the JSON 'tags' column into a Python list column 'tags_list' in-place."""
-    if not df.empty and "tags" in df.columns:
-        df["tags_list"] = df["tags"].apply(lambda x: json.loads(x) if x else [])
+def _read_frame(conn: sqlite3.Connection, query: str, params=()) -> pd.DataFrame:
+    """
+    Run a row-returning query into a DataFrame through a plain-tuple cursor.
+    Same result as pd.read_sql_query, minus the sqlite3.Row wrapper it would
+    build for every row on our Row-factory connections.
+    """
+    cur = conn.cursor()
+    cur.row_factory = None
+    try:
+        cur.execute(query, params)
+        columns = [d[0] for d in cur.description]
+        return pd.DataFrame.from_records(cur.fetchall(), columns=columns, coerce_float=True)
+    finally:
+        cur.close()
+
+
+def _column_values(conn: sqlite3.Connection, query: str, params=()) -> list:
+    """First column of every row, fetched as plain tuples (no sqlite3.Row per row)."""
+    cur = conn.cursor()
+    cur.row_factory = None
+    try:
+        return [r[0] for r in cur.execute(query, params)]
+    finally:
+        cur.close()
+
+
+@lru_cache(maxsize=32)
+def _cached_column_values(epoch: tuple, query: str) -> tuple:
+    """
+    _column_values through this thread's reader, memoized per _data_epoch().
+    Callers pass the epoch so a write or sync makes every old entry a miss.
+    """
+    return tuple(_column_values(get_reader_conn(), query))
+
+
+def _iter_frames(conn: sqlite3.Connection, query: str, params=(),
+                 chunksize: int = 50_000):
+    """
+    Like _read_frame, but yield the result as DataFrames of at most chunksize
+    rows, so only one chunk of raw tuples is alive at a time. Always yields at
+    least one (possibly empty) frame so the columns are known.
+    """
+    cur = conn.cursor()
+    cur.row_factory = None
+    try:
+        cur.execute(query, params)
+        columns = [d[0] for d in cur.description]
+        rows = cur.fetchmany(chunksize)
+        yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+        while len(rows) == chunksize:
+            rows = cur.fetchmany(chunksize)
+            if rows:
+                yield pd.DataFrame.from_records(rows, columns=columns, coerce_float=True)
+    finally:
+        cur.close()
+
+
+def _categorize_tags(df: pd.DataFrame) -> None:
+    """
+    Store the raw JSON 'tags' column as a pandas 'category' in-place. Entries
+    repeat a small set of tag combinations, so each distinct string is kept
+    once; decode_tags() / has_tag() then work per category, not per row.
+    """
+    if "tags" in df.columns:
+        df["tags"] = df["tags"].astype("category")
+
+
+def _tag_categories(df: pd.DataFrame) -> pd.Series:
+    """The 'tags' column as a categorical (casting a copy if it isn't one)."""
+    tags = df["tags"]
+    if not isinstance(tags.dtype, pd.CategoricalDtype):
+        tags = tags.astype("category")
+    return tags
+
+
+def decode_tags(df: pd.DataFrame) -> pd.Series:
+    """
+    Decode the JSON 'tags' column into a Series of tag-name lists, on demand.
+    Each distinct JSON string is decoded once (orjson when installed) and
+    spread over the rows by category code; NULL tags decode to []. Rows with
+    the same tags share one list object, so treat the lists as read-only.
+    """
+    tags = _tag_categories(df)
+    # One slot per category plus a trailing [] that code -1 (NULL) indexes
+    mapping = np.empty(len(tags.cat.categories) + 1, dtype=object)
+    for i, raw in enumerate(tags.cat.categories):
+        mapping[i] = _json_loads(raw) if raw else []
+    mapping[-1] = []
+    return pd.Series(mapping[tags.cat.codes.to_numpy()], index=df.index, name="tags_list")
+
+
+def has_tag(df: pd.DataFrame, tag: str) -> pd.Series:
+    """Boolean mask of rows whose tags include exactly `tag` (case-sensitive)."""
+    tags = _tag_categories(df)
+    hits = np.array(
+        [tag in (_json_loads(raw) if raw else []) for raw in tags.cat.categories] + [False]
+    )
+    return pd.Series(hits[tags.cat.codes.to_numpy()], index=df.index)
+
+
+def _parse_start(df: pd.DataFrame) -> None:
+    """
+    Parse the ISO 'start' column to naive datetime64 in-place, once at load time.
+    The UTC offset is dropped so values keep the wall-clock time as logged.
+    """
+    if "start" in df.columns:
+        df["start"] = pd.to_datetime(df["start"].str[:19], errors="coerce")
 
 
-def get_connection() -> sqlite3.Connection:
-    """Get a SQLite connection, creating the database and tables if needed."""
+# Compact dtypes for numeric columns: hours are only shown to a decimal or two
+# and the calendar parts fit easily in int16. IDs stay int64 (Toggl IDs exceed int32).
+NUMERIC_DTYPES = {
+    "duration_hours": "float32",
+    "start_year": "int16",
+    "start_month": "int16",
+    "start_day": "int16",
+    "start_week": "int16",
+}
+
+
+def _downcast_numeric(df: pd.DataFrame) -> None:
+    """Cast the columns in NUMERIC_DTYPES in-place; integer casts skip columns holding NULLs."""
+    for col, dtype in NUMERIC_DTYPES.items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith("int") and df[col].isna().any():
+            continue
+        df[col] = df[col].astype(dtype)
+
+
+# Low-cardinality text columns that the pages group by
+CATEGORY_COLUMNS = ("project_name", "description", "client_name", "task_name")
+
+
+def categorize_columns(df: pd.DataFrame,
+                       columns: tuple[str, ...] = CATEGORY_COLUMNS) -> pd.DataFrame:
+    """
+    Cast grouping columns to pandas 'category' in-place and return df.
+    groupby then hashes integer codes instead of strings. Group with
+    observed=True, and cast results back to object before replacing ""
+    with a label such as "(No Project)".
+    """
+    for col in columns:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _tune_connection(conn: sqlite3.Connection, cache_kib: int) -> None:
+    """
+    Apply the PRAGMAs every handle shares: WAL with synchronous=NORMAL (far
+    fewer fsyncs, still durable at checkpoints), in-memory temp storage,
+    a 256 MB mmap, a 5 s wait on locks held elsewhere, and a page cache of
+    cache_kib KiB.
+    """
+    conn.executescript(
+        "PRAGMA journal_mode=WAL; "
+        "PRAGMA synchronous=NORMAL; "
+        "PRAGMA temp_store=MEMORY; "
+        "PRAGMA mmap_size=268435456; "
+        "PRAGMA busy_timeout=5000; "
+        f"PRAGMA cache_size=-{int(cache_kib)};"
+    )
+
+
+# Database files whose schema has been created/migrated by this process
+_initialized_paths: set[str] = set()
+_init_lock = threading.Lock()
+
+
+def get_connection(check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Get a SQLite connection, creating the database and tables if needed.
+    The schema DDL and migrations run once per database file per process.
+    """
     DATA_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(str(DB_PATH))
+    fresh = not DB_PATH.exists()
+    conn = sqlite3.connect(str(DB_PATH), check_same_thread=check_same_thread)
     conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA journal_mode=WAL")
-    _create_tables(conn)
-    _apply_migrations(conn)
+    _tune_connection(conn, cache_kib=20000)
+    with _init_lock:
+        if fresh or str(DB_PATH) not in _initialized_paths:
+            _create_tables(conn)
+            _apply_migrations(conn)
+            _initialized_paths.add(str(DB_PATH))
     return conn
 
 
+# Connection roles. One writer, shared by every sync and serialized by
+# _writer_lock, owns the schema; each thread gets its own read-only handle,
+# so a long dashboard read never waits behind a sync write (WAL lets
+# readers and the writer run concurrently). Streamlit runs most reruns on a
+# fresh thread, so read handles are pooled: a thread leases one for its
+# lifetime and the lease hands it back to _idle_readers when the thread ends.
+_writer_conn: sqlite3.Connection | None = None
+_writer_lock = threading.RLock()
+_readers = threading.local()
+_idle_readers: dict[str, list[sqlite3.Connection]] = {}
+_idle_lock = threading.Lock()
+
+
+def get_writer_conn() -> sqlite3.Connection:
+    """
+    Return the process-wide writer connection, creating the database and
+    schema on first use. Opened with check_same_thread=False because syncs run
+    on background threads; hold writer_connection() while writing through it.
+    Callers must NOT close it.
+    """
+    global _writer_conn
+    # Fast path without the lock: a running sync holds it for its whole write
+    if _writer_conn is not None:
+        return _writer_conn
+    with _writer_lock:
+        if _writer_conn is None:
+            _writer_conn = get_connection(check_same_thread=False)
+        return _writer_conn
+
+
+@contextmanager
+def writer_connection():
+    """
+    Context manager yielding the writer connection while holding the writer lock.
+    If the block raises, any transaction it left open (commit=False writes)
+    is rolled back so the shared connection is clean for the next sync.
+    """
+    with _writer_lock:
+        conn = get_writer_conn()
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+
+class _ReaderLease:
+    """A thread's claim on a pooled read connection (lives in _readers)."""
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+
+
+def _return_reader(path: str, conn: sqlite3.Connection) -> None:
+    with _idle_lock:
+        _idle_readers.setdefault(path, []).append(conn)
+
+
+def get_reader_conn() -> sqlite3.Connection:
+    """
+    Return this thread's read-only connection (mode=ro), leasing it on first use.
+
+    A handle left by a finished thread (e.g. an earlier Streamlit rerun) is
+    reused with its tuning and warm page cache; otherwise a new one is opened.
+    Readers never run DDL, so the writer is touched once to make sure the
+    database and schema exist. Each handle gets the usual tuning plus a larger
+    64 MB page cache. Callers must NOT close it.
+    """
+    lease = getattr(_readers, "lease", None)
+    if lease is None:
+        path = str(DB_PATH)
+        with _idle_lock:
+            idle = _idle_readers.get(path)
+            conn = idle.pop() if idle else None
+        if conn is None:
+            get_writer_conn()
+            # check_same_thread=False: the handle moves to a later thread once
+            # this one ends, but only ever serves one thread at a time
+            conn = sqlite3.connect(
+                f"file:{path}?mode=ro", uri=True, isolation_level=None,
+                check_same_thread=False,
+            )
+            conn.row_factory = sqlite3.Row
+            _tune_connection(conn, cache_kib=65536)
+        lease = _readers.lease = _ReaderLease(conn)
+        # Thread exit clears _readers, dropping the lease and freeing the handle
+        weakref.finalize(lease, _return_reader, path, conn)
+    return lease.conn
+
+
 @contextmanager
 def managed_connection():
-    """Context manager that auto-closes the connection on exit."""
+    """
+    Context manager that auto-closes the connection on exit.
+    PRAGMA optimize runs first so SQLite refreshes any stale planner stats.
+    """
     conn = get_connection()
     try:
         yield conn
     finally:
+        try:
+            conn.execute("PRAGMA optimize")
+        except sqlite3.Error:
+            pass
         conn.close()
 
 
@@ -80,6 +363,7 @@ def _create_tables(conn: sqlite3.Connection):
             start_day       INTEGER,
             start_week      INTEGER,        -- ISO week number
             duration_hours  REAL,           -- duration in hours
+            start_ts        INTEGER,        -- start as Unix epoch seconds (offset applied)
             -- Enrichment columns (populated by JSON sync, NULL from CSV sync)
             toggl_id        INTEGER UNIQUE, -- native Toggl entry ID (NULL until enriched)
             task_id         INTEGER,        -- Premium: task assignment
@@ -145,16 +429,53 @@ def _create_tables(conn: sqlite3.Connection):
             value           TEXT
         );
 
-        -- Original indexes
-        CREATE INDEX IF NOT EXISTS idx_entries_start_date ON time_entries(start_date);
+        -- One row per (entry, tag name) so tag filters are indexed lookups
+        -- instead of LIKE scans over the JSON 'tags' column. Names are also
+        -- resolved from tag_ids, so entries logged under a since-renamed tag
+        -- are found by the current name too.
+        CREATE TABLE IF NOT EXISTS entry_tags (
+            entry_id        INTEGER NOT NULL,
+            tag_name        TEXT NOT NULL COLLATE NOCASE,
+            PRIMARY KEY (entry_id, tag_name)
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_entry_tags_name ON entry_tags(tag_name, entry_id);
+
+        -- Full-text index for search_entries, keyed by time_entries.id. The
+        -- trigram tokenizer keeps substring matching (like LIKE '%kw%') but
+        -- answers from an inverted index. It keeps its own copy of the text
+        -- because INSERT OR REPLACE doesn't fire delete triggers.
+        CREATE VIRTUAL TABLE IF NOT EXISTS entries_fts USING fts5(
+            description, project_name, tags, tokenize = 'trigram'
+        );
+
+        -- Whole-history aggregates for get_total_stats, refreshed by
+        -- upsert_time_entries. 'value' is left untyped so numbers stay numbers.
+        CREATE TABLE IF NOT EXISTS stats_cache (
+            key             TEXT PRIMARY KEY,
+            value
+        );
+
+        -- Original indexes (the date ones are partial, see _PARTIAL_INDEXES)
         CREATE INDEX IF NOT EXISTS idx_entries_year ON time_entries(start_year);
-        CREATE INDEX IF NOT EXISTS idx_entries_month_day ON time_entries(start_month, start_day);
         CREATE INDEX IF NOT EXISTS idx_entries_project ON time_entries(project_id);
-        CREATE INDEX IF NOT EXISTS idx_entries_week ON time_entries(start_year, start_week);
     """)
     conn.commit()
 
 
+# Date indexes restricted to completed entries. Every query filtering on these
+# columns also says duration > 0, so running entries (negative duration) never
+# enter the index. idx_entries_year stays whole because get_year_bounds and
+# get_available_years read it without that filter.
+_PARTIAL_INDEXES = {
+    "idx_entries_start_date":
+        "CREATE INDEX idx_entries_start_date ON time_entries(start_date) WHERE duration > 0",
+    "idx_entries_month_day":
+        "CREATE INDEX idx_entries_month_day ON time_entries(start_month, start_day) WHERE duration > 0",
+    "idx_entries_week":
+        "CREATE INDEX idx_entries_week ON time_entries(start_year, start_week) WHERE duration > 0",
+}
+
+
 def _apply_migrations(conn: sqlite3.Connection):
     """
     Idempotently add enrichment columns to pre-existing databases.
@@ -173,6 +494,7 @@ def _apply_migrations(conn: sqlite3.Connection):
         "ALTER TABLE time_entries ADD COLUMN task_name TEXT",
         "ALTER TABLE time_entries ADD COLUMN client_name TEXT",
         "ALTER TABLE time_entries ADD COLUMN user_id INTEGER",
+        "ALTER TABLE time_entries ADD COLUMN start_ts INTEGER",
         # projects enrichment columns
         "ALTER TABLE projects ADD COLUMN client_id INTEGER",
         "ALTER TABLE projects ADD COLUMN billable INTEGER",
@@ -196,6 +518,19 @@ def _apply_migrations(conn: sqlite3.Connection):
         "CREATE INDEX IF NOT EXISTS idx_entries_client_name ON time_entries(client_name)",
         "CREATE INDEX IF NOT EXISTS idx_tasks_project ON tasks(project_id)",
         "CREATE INDEX IF NOT EXISTS idx_projects_client ON projects(client_id)",
+        # Backs COUNT(DISTINCT project_name) in get_total_stats and per-project lookups
+        "CREATE INDEX IF NOT EXISTS idx_entries_project_name ON time_entries(project_name)",
+        # Covers date-range filters grouped by project (dashboard aggregations)
+        "CREATE INDEX IF NOT EXISTS idx_entries_date_project ON time_entries(start_date, project_name)",
+        # Retrospect lookups filter on week / month-day across every year and
+        # order by year; (start_year, start_week) can't serve a week-only filter
+        "CREATE INDEX IF NOT EXISTS idx_entries_week_year ON time_entries(start_week, start_year, start)",
+        "CREATE INDEX IF NOT EXISTS idx_entries_month_day_year ON time_entries(start_month, start_day, start_year, start)",
+        # Newest-first readers with a LIMIT walk this backwards and stop early
+        "CREATE INDEX IF NOT EXISTS idx_entries_start_ts ON time_entries(start_ts)",
+        # Fill start_ts on rows written before the column existed
+        "UPDATE time_entries SET start_ts = CAST(strftime('%s', start) AS INTEGER) "
+        "WHERE start_ts IS NULL AND strftime('%s', start) IS NOT NULL",
     ]
 
     for stmt in migrations:
@@ -205,6 +540,34 @@ def _apply_migrations(conn: sqlite3.Connection):
             # Column already exists or index already exists — safe to ignore
             pass
 
+    # Create the partial date indexes, replacing the full-table versions older
+    # databases have under the same names, then refresh planner statistics
+    partial = {r["name"]: r["partial"] for r in conn.execute("PRAGMA index_list(time_entries)")}
+    rebuilt = False
+    for name, ddl in _PARTIAL_INDEXES.items():
+        if partial.get(name) == 1:
+            continue
+        if name in partial:
+            conn.execute(f"DROP INDEX {name}")
+        conn.execute(ddl)
+        rebuilt = True
+    if rebuilt:
+        conn.execute("ANALYZE")
+
+    # Databases synced before entry_tags existed: fill it once from the JSON columns
+    if (conn.execute("SELECT 1 FROM entry_tags LIMIT 1").fetchone() is None
+            and conn.execute("SELECT 1 FROM time_entries LIMIT 1").fetchone() is not None):
+        conn.execute(_ENTRY_TAGS_INSERT_SQL.format(where="1"))
+
+    # Same for entries_fts and stats_cache on databases synced before they existed
+    if (conn.execute("SELECT 1 FROM entries_fts LIMIT 1").fetchone() is None
+            and conn.execute("SELECT 1 FROM time_entries LIMIT 1").fetchone() is not None):
+        conn.execute(_ENTRY_FTS_INSERT_SQL.format(where="1"))
+
+    if (conn.execute("SELECT 1 FROM stats_cache LIMIT 1").fetchone() is None
+            and conn.execute("SELECT 1 FROM time_entries LIMIT 1").fetchone() is not None):
+        _refresh_stats_cache(conn)
+
     conn.commit()
 
 
@@ -212,9 +575,148 @@ def _apply_migrations(conn: sqlite3.Connection):
 # Insert / Upsert
 # ---------------------------------------------------------------------------
 
-def upsert_time_entries(conn: sqlite3.Connection, entries: list[dict]):
+@contextmanager
+def _immediate_transaction(conn: sqlite3.Connection, commit: bool = True):
+    """
+    Run the block inside a BEGIN IMMEDIATE transaction and commit it at the end.
+    The write lock is taken up front, so the transaction never has to upgrade
+    from a read lock mid-way. If a transaction is already open (an earlier
+    commit=False write) the block joins it. With commit=False the transaction
+    is left open so several writes share one commit (one fsync); the caller
+    must end it with commit_writes(). Any error rolls the whole transaction back.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield
+    except BaseException:
+        conn.rollback()
+        raise
+    if commit:
+        commit_writes(conn)
+
+
+def commit_writes(conn: sqlite3.Connection):
+    """
+    Commit the open write transaction (the end of a batch of commit=False
+    writes) and invalidate the in-process read caches keyed by _data_epoch().
+    The counter moves only after the commit, so a reader can never rebuild a
+    cache under the new key from rows that are not yet visible.
+    """
+    global _write_generation
+    conn.commit()
+    _write_generation += 1
+
+
+# Derived columns are computed by SQLite from the bound 'start' (?3) and
+# 'duration' (?5) inside the INSERT, so Python only ships the raw fields.
+# Dates use the wall-clock date as written (the offset is ignored); the ISO
+# week is the week of that date's Thursday. Unparseable starts yield NULLs.
+_START_DAY_SQL = "substr(?3, 1, 10)"
+_ISO_WEEK_SQL = (
+    f"(CAST(strftime('%j', date({_START_DAY_SQL}, printf('%+d days', "
+    f"3 - (CAST(strftime('%w', {_START_DAY_SQL}) AS INTEGER) + 6) % 7))) AS INTEGER) - 1) / 7 + 1"
+)
+
+_UPSERT_ENTRY_SQL = f"""
+    INSERT OR REPLACE INTO time_entries
+        (id, description, start, stop, duration, project_id, project_name,
+         workspace_id, tags, tag_ids, billable, at,
+         start_date, start_year, start_month, start_day, start_week, duration_hours,
+         start_ts, toggl_id, task_id, task_name, client_name, user_id)
+    VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9, ?10, ?11, ?12,
+            date({_START_DAY_SQL}),
+            CAST(strftime('%Y', {_START_DAY_SQL}) AS INTEGER),
+            CAST(strftime('%m', {_START_DAY_SQL}) AS INTEGER),
+            CAST(strftime('%d', {_START_DAY_SQL}) AS INTEGER),
+            {_ISO_WEEK_SQL},
+            MAX(?5, 0) / 3600.0,
+            CAST(strftime('%s', ?3) AS INTEGER),
+            ?13, ?14, ?15, ?16, ?17)
+"""
+
+
+# (entry, tag name) pairs from the JSON tags plus the current names of tag_ids;
+# {where} picks the entries, e.g. "te.id = ?" per upserted row
+_ENTRY_TAGS_INSERT_SQL = """
+    INSERT OR IGNORE INTO entry_tags (entry_id, tag_name)
+    SELECT te.id, j.value FROM time_entries te, json_each(te.tags) j
+    WHERE {where} AND json_valid(te.tags) AND j.value != ''
+    UNION
+    SELECT te.id, t.name FROM time_entries te, json_each(te.tag_ids) j
+    JOIN tags t ON t.id = j.value
+    WHERE {where} AND json_valid(te.tag_ids) AND t.name != ''
+"""
+
+
+# Copies the searchable text of the entries picked by {where} into entries_fts
+_ENTRY_FTS_INSERT_SQL = """
+    INSERT INTO entries_fts (rowid, description, project_name, tags)
+    SELECT id, description, project_name, tags FROM time_entries WHERE {where}
+"""
+
+# Per-entry variants, formatted once so every batch reuses the same SQL text
+# (and so the same cached prepared statement)
+_ENTRY_TAGS_BY_ID_SQL = _ENTRY_TAGS_INSERT_SQL.format(where="te.id = ?1")
+_ENTRY_FTS_BY_ID_SQL = _ENTRY_FTS_INSERT_SQL.format(where="id = ?1")
+
+
+_TOTAL_STATS_KEYS = ("total_entries", "total_hours", "earliest_date",
+                     "latest_date", "unique_projects", "years_tracked")
+
+_TOTAL_STATS_SQL = """
+    SELECT
+        COUNT(*) as total_entries,
+        COALESCE(SUM(duration_hours), 0) as total_hours,
+        MIN(start_date) as earliest_date,
+        MAX(start_date) as latest_date,
+        COUNT(DISTINCT CASE WHEN project_name != '' THEN project_name END) as unique_projects,
+        COUNT(DISTINCT start_year) as years_tracked
+    FROM time_entries
+    WHERE duration > 0
+"""
+
+
+def _refresh_stats_cache(conn: sqlite3.Connection):
+    """
+    Recompute the get_total_stats aggregates into stats_cache. Runs once per
+    write batch (INSERT OR REPLACE can overwrite rows, so the totals can't be
+    adjusted from the new batch alone); reads then never scan time_entries.
     """
-    Insert or replace time entries. Computes derived date columns automatically.
+    row = conn.execute(_TOTAL_STATS_SQL).fetchone()
+    conn.executemany(
+        "INSERT OR REPLACE INTO stats_cache (key, value) VALUES (?, ?)",
+        zip(_TOTAL_STATS_KEYS, tuple(row)),
+    )
+
+
+def _entry_rows(entries: list[dict]):
+    """Yield the raw INSERT fields per entry; _UPSERT_ENTRY_SQL derives the rest."""
+    for e in entries:
+        yield (
+            e.get("id"),
+            e.get("description"),
+            e.get("start", ""),
+            e.get("stop"),
+            e.get("duration", 0),
+            e.get("project_id"),
+            e.get("project_name", ""),
+            e.get("workspace_id") or e.get("wid"),
+            json.dumps(e.get("tags") or []),
+            json.dumps(e.get("tag_ids") or []),
+            1 if e.get("billable") else 0,
+            e.get("at", ""),
+            e.get("toggl_id"),
+            e.get("task_id"),
+            e.get("task_name", "") or "",
+            e.get("client_name", "") or "",
+            e.get("user_id"),
+        )
+
+
+def upsert_time_entries(conn: sqlite3.Connection, entries: list[dict], commit: bool = True):
+    """
+    Insert or replace time entries. Derived date columns are computed by SQLite.
     Handles both CSV-sourced entries (synthetic id, toggl_id=None) and
     JSON-sourced entries (id = toggl_id = native Toggl integer).
 
@@ -224,6 +726,9 @@ def upsert_time_entries(conn: sqlite3.Connection, entries: list[dict]):
     prevents re-duplication when sync_current_year() runs after an enrichment sync.
     Enriched entries (toggl_id IS NOT NULL) always go through INSERT OR REPLACE and
     will update any stale CSV row that snuck in via the synthetic id collision path.
+
+    Like the other upserts and set_sync_meta, commit=False leaves the write
+    transaction open so a sync can batch several writes into one commit.
     """
     # Build a lookup of enriched entries already in the DB so CSV entries can be
     # skipped when they duplicate an enriched row. We only need start[:19] + duration
@@ -250,115 +755,71 @@ def upsert_time_entries(conn: sqlite3.Connection, entries: list[dict]):
 
     entries_to_write = enriched_entries + filtered_csv
 
-    rows = []
-    for e in entries_to_write:
-        start_str = e.get("start", "")
-        try:
-            dt = datetime.fromisoformat(start_str.replace("Z", "+00:00"))
-            start_date = dt.strftime("%Y-%m-%d")
-            start_year = dt.year
-            start_month = dt.month
-            start_day = dt.day
-            start_week = dt.isocalendar()[1]
-        except (ValueError, AttributeError):
-            start_date = start_str[:10] if len(start_str) >= 10 else None
-            start_year = int(start_str[:4]) if len(start_str) >= 4 else None
-            start_month = int(start_str[5:7]) if len(start_str) >= 7 else None
-            start_day = int(start_str[8:10]) if len(start_str) >= 10 else None
-            start_week = None
-
-        duration_sec = e.get("duration", 0)
-        duration_hours = max(duration_sec, 0) / 3600.0
-
-        tags = e.get("tags") or []
-        tag_ids = e.get("tag_ids") or []
-
-        rows.append((
-            e.get("id"),
-            e.get("description"),
-            start_str,
-            e.get("stop"),
-            duration_sec,
-            e.get("project_id"),
-            e.get("project_name", ""),
-            e.get("workspace_id") or e.get("wid"),
-            json.dumps(tags),
-            json.dumps(tag_ids),
-            1 if e.get("billable") else 0,
-            e.get("at", ""),
-            start_date,
-            start_year,
-            start_month,
-            start_day,
-            start_week,
-            duration_hours,
-            e.get("toggl_id"),
-            e.get("task_id"),
-            e.get("task_name", "") or "",
-            e.get("client_name", "") or "",
-            e.get("user_id"),
-        ))
-
-    conn.executemany("""
-        INSERT OR REPLACE INTO time_entries
-            (id, description, start, stop, duration, project_id, project_name,
-             workspace_id, tags, tag_ids, billable, at,
-             start_date, start_year, start_month, start_day, start_week, duration_hours,
-             toggl_id, task_id, task_name, client_name, user_id)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, rows)
-    conn.commit()
+    # Rows stream from a generator straight into one write transaction,
+    # together with a rebuild of each written entry's entry_tags rows
+    ids = [(e.get("id"),) for e in entries_to_write]
+    with _immediate_transaction(conn, commit):
+        conn.executemany(_UPSERT_ENTRY_SQL, _entry_rows(entries_to_write))
+        conn.executemany("DELETE FROM entry_tags WHERE entry_id = ?", ids)
+        conn.executemany(_ENTRY_TAGS_BY_ID_SQL, ids)
+        conn.executemany("DELETE FROM entries_fts WHERE rowid = ?", ids)
+        conn.executemany(_ENTRY_FTS_BY_ID_SQL, ids)
+        _refresh_stats_cache(conn)
 
 
-def upsert_projects(conn: sqlite3.Connection, projects: list[dict]):
+def upsert_projects(conn: sqlite3.Connection, projects: list[dict], commit: bool = True):
     """
     Insert or replace projects. Captures Premium fields (rate, fixed_fee, etc.)
     when present; they remain NULL in the DB if the API returns nothing for them.
     """
-    rows = []
-    for p in projects:
-        recurring_params = p.get("recurring_parameters")
-        recurring_params_json = (
-            json.dumps(recurring_params) if recurring_params is not None else None
-        )
-        rows.append((
-            p["id"],
-            p.get("name", ""),
-            p.get("workspace_id") or p.get("wid"),
-            p.get("color", ""),
-            1 if p.get("active", True) else 0,
-            p.get("at", ""),
-            # Enrichment fields
-            p.get("client_id"),
-            1 if p.get("billable") else None,
-            p.get("rate"),
-            p.get("currency"),
-            p.get("fixed_fee"),
-            p.get("estimated_hours"),
-            p.get("estimated_seconds"),
-            1 if p.get("auto_estimates") else None,
-            1 if p.get("recurring") else None,
-            recurring_params_json,
-            1 if p.get("template") else None,
-        ))
-
-    conn.executemany("""
-        INSERT OR REPLACE INTO projects
-            (id, name, workspace_id, color, active, at,
-             client_id, billable, rate, currency, fixed_fee,
-             estimated_hours, estimated_seconds, auto_estimates,
-             recurring, recurring_parameters, template)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-    """, rows)
-    conn.commit()
-
-
-def upsert_tags(conn: sqlite3.Connection, tags: list[dict]):
+    def project_rows():
+        for p in projects:
+            recurring_params = p.get("recurring_parameters")
+            recurring_params_json = (
+                json.dumps(recurring_params) if recurring_params is not None else None
+            )
+            yield (
+                p["id"],
+                p.get("name", ""),
+                p.get("workspace_id") or p.get("wid"),
+                p.get("color", ""),
+                1 if p.get("active", True) else 0,
+                p.get("at", ""),
+                # Enrichment fields
+                p.get("client_id"),
+                1 if p.get("billable") else None,
+                p.get("rate"),
+                p.get("currency"),
+                p.get("fixed_fee"),
+                p.get("estimated_hours"),
+                p.get("estimated_seconds"),
+                1 if p.get("auto_estimates") else None,
+                1 if p.get("recurring") else None,
+                recurring_params_json,
+                1 if p.get("template") else None,
+            )
+
+    with _immediate_transaction(conn, commit):
+        conn.executemany("""
+            INSERT OR REPLACE INTO projects
+                (id, name, workspace_id, color, active, at,
+                 client_id, billable, rate, currency, fixed_fee,
+                 estimated_hours, estimated_seconds, auto_estimates,
+                 recurring, recurring_parameters, template)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, project_rows())
+
+
+def upsert_tags(conn: sqlite3.Connection, tags: list[dict], commit: bool = True):
     """
     Insert or replace tags. Captures enrichment fields (creator_id, at,
     deleted_at) when present from the API v9 response.
+
+    entry_tags holds the current name of every tag in an entry's tag_ids, so
+    when a tag is renamed the entry_tags rows of every entry carrying it are
+    rebuilt here, not only those of the entries the same sync re-upserts.
     """
-    rows = [
+    rows = (
         (
             t["id"],
             t.get("name", ""),
@@ -368,17 +829,32 @@ def upsert_tags(conn: sqlite3.Connection, tags: list[dict]):
             t.get("deleted_at"),
         )
         for t in tags
-    ]
-    conn.executemany("""
-        INSERT OR REPLACE INTO tags (id, name, workspace_id, creator_id, at, deleted_at)
-        VALUES (?, ?, ?, ?, ?, ?)
-    """, rows)
-    conn.commit()
-
-
-def upsert_clients(conn: sqlite3.Connection, clients: list[dict]):
+    )
+    with _immediate_transaction(conn, commit):
+        old_names = dict(conn.execute("SELECT id, name FROM tags").fetchall())
+        renamed = [
+            t["id"] for t in tags
+            if t["id"] in old_names and old_names[t["id"]] != t.get("name", "")
+        ]
+        conn.executemany("""
+            INSERT OR REPLACE INTO tags (id, name, workspace_id, creator_id, at, deleted_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+        if renamed:
+            marks = ",".join("?" * len(renamed))
+            ids = conn.execute(
+                "SELECT DISTINCT te.id FROM time_entries te, json_each(te.tag_ids) j "
+                f"WHERE json_valid(te.tag_ids) AND j.value IN ({marks})",
+                renamed,
+            ).fetchall()
+            ids = [(r[0],) for r in ids]
+            conn.executemany("DELETE FROM entry_tags WHERE entry_id = ?", ids)
+            conn.executemany(_ENTRY_TAGS_BY_ID_SQL, ids)
+
+
+def upsert_clients(conn: sqlite3.Connection, clients: list[dict], commit: bool = True):
     """Insert or replace clients."""
-    rows = [
+    rows = (
         (
             c["id"],
             c.get("name", ""),
@@ -387,17 +863,17 @@ def upsert_clients(conn: sqlite3.Connection, clients: list[dict]):
             c.get("at", ""),
         )
         for c in clients
-    ]
-    conn.executemany("""
-        INSERT OR REPLACE INTO clients (id, name, workspace_id, archived, at)
-        VALUES (?, ?, ?, ?, ?)
-    """, rows)
-    conn.commit()
+    )
+    with _immediate_transaction(conn, commit):
+        conn.executemany("""
+            INSERT OR REPLACE INTO clients (id, name, workspace_id, archived, at)
+            VALUES (?, ?, ?, ?, ?)
+        """, rows)
 
 
-def upsert_tasks(conn: sqlite3.Connection, tasks: list[dict]):
+def upsert_tasks(conn: sqlite3.Connection, tasks: list[dict], commit: bool = True):
     """Insert or replace tasks (Premium feature)."""
-    rows = [
+    rows = (
         (
             t["id"],
             t.get("name", ""),
@@ -409,22 +885,38 @@ def upsert_tasks(conn: sqlite3.Connection, tasks: list[dict]):
             t.get("at", ""),
         )
         for t in tasks
-    ]
-    conn.executemany("""
-        INSERT OR REPLACE INTO tasks
-            (id, name, project_id, workspace_id, active, estimated_seconds, tracked_seconds, at)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-    """, rows)
-    conn.commit()
+    )
+    with _immediate_transaction(conn, commit):
+        conn.executemany("""
+            INSERT OR REPLACE INTO tasks
+                (id, name, project_id, workspace_id, active, estimated_seconds, tracked_seconds, at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
 
 
 # ---------------------------------------------------------------------------
 # Sync metadata
 # ---------------------------------------------------------------------------
 
-def set_sync_meta(conn: sqlite3.Connection, key: str, value: str):
-    conn.execute("INSERT OR REPLACE INTO sync_meta (key, value) VALUES (?, ?)", (key, value))
-    conn.commit()
+# Bumped by every committed write transaction in this process (see commit_writes)
+_write_generation = 0
+
+
+def _data_epoch(conn: sqlite3.Connection) -> tuple:
+    """
+    Cache key for "the data as of now": the database path, this process's
+    write counter and the last_* sync stamps, which also change when a sync
+    runs in another process. Costs one small sync_meta read.
+    """
+    stamps = conn.execute(
+        "SELECT key, value FROM sync_meta WHERE key LIKE 'last_%' ORDER BY key"
+    ).fetchall()
+    return (str(DB_PATH), _write_generation, tuple(tuple(r) for r in stamps))
+
+
+def set_sync_meta(conn: sqlite3.Connection, key: str, value: str, commit: bool = True):
+    with _immediate_transaction(conn, commit):
+        conn.execute("INSERT OR REPLACE INTO sync_meta (key, value) VALUES (?, ?)", (key, value))
 
 
 def get_sync_meta(conn: sqlite3.Connection, key: str) -> str | None:
@@ -436,43 +928,395 @@ def get_sync_meta(conn: sqlite3.Connection, key: str) -> str | None:
 # Query helpers — these power the dashboard and retrospect pages
 # ---------------------------------------------------------------------------
 
+def _entry_filter_sql(year: int | None = None, start_date: str | None = None,
+                      end_date: str | None = None) -> tuple[str, list]:
+    """WHERE clause + params shared by get_entries_df and the aggregation helpers."""
+    where = "duration > 0"
+    params: list = []
+    if year:
+        where += " AND start_year = ?"
+        params.append(year)
+    if start_date:
+        where += " AND start_date >= ?"
+        params.append(start_date)
+    if end_date:
+        where += " AND start_date <= ?"
+        params.append(end_date)
+    return where, params
+
+
+# Computed in the SELECT so pandas never slices strings row by row
+_DERIVED_COLUMNS = {
+    "year_month": "SUBSTR(start_date, 1, 7) AS year_month",
+}
+
+# Columns the cross-year, search and tag readers return unless told otherwise:
+# everything the pages and chat answers read, without the tag_ids / at /
+# stop / workspace bookkeeping columns
+DEFAULT_COLS: tuple[str, ...] = (
+    "id", "description", "start", "start_date", "start_year", "project_name",
+    "task_name", "client_name", "duration_hours", "tags",
+)
+
+
+def _select_list(columns: tuple[str, ...], table: str = "") -> str:
+    """Comma-joined SELECT list for columns, optionally qualified with a table alias."""
+    prefix = f"{table}." if table else ""
+    return ", ".join(prefix + c for c in columns)
+
+
+def _projects_containing(conn: sqlite3.Connection, needle: str) -> list[str]:
+    """
+    Every known project name containing needle, ignoring case. Resolved
+    against the cached name list so the entry filter becomes an indexed
+    project_name IN (...) instead of a substring test on every row.
+    """
+    needle = needle.lower()
+    names = _cached_column_values(_data_epoch(conn), _PROJECT_NAMES_SQL)
+    return [n for n in names if needle in n.lower()]
+
+
+def _entry_select(year: int | None, start_date: str | None, end_date: str | None,
+                  columns: list[str] | None, tag: str | None, month: int | None = None,
+                  project_names: list[str] | None = None) -> tuple[str, str, list]:
+    """
+    Column list, WHERE clause and params of an entry SELECT.
+    project_names (when not None) keeps only those exact projects.
+    """
+    if columns:
+        col_expr = ", ".join(_DERIVED_COLUMNS.get(c, c) for c in columns)
+    else:
+        col_expr = ", ".join(["*", *_DERIVED_COLUMNS.values()])
+    where, params = _entry_filter_sql(year, start_date, end_date)
+    if month:
+        where += " AND start_month = ?"
+        params.append(month)
+    if project_names is not None:
+        where += f" AND project_name IN ({', '.join('?' * len(project_names))})"
+        params.extend(project_names)
+    if tag:
+        where += " AND id IN (SELECT entry_id FROM entry_tags WHERE tag_name = ?)"
+        params.append(tag)
+    return col_expr, where, params
+
+
+def _query_entries(conn: sqlite3.Connection, col_expr: str, where: str, params: list) -> pd.DataFrame:
+    """
+    Run the entry SELECT and apply the shared post-processing (start, dtypes, tags).
+    Rows are fetched in chunks with 'start' parsed per chunk, so the raw
+    tuples and ISO strings of the whole table are never held at once.
+    """
+    query = f"SELECT {col_expr} FROM time_entries WHERE {where} ORDER BY start ASC"
+    chunks = []
+    for chunk in _iter_frames(conn, query, params):
+        _parse_start(chunk)
+        chunks.append(chunk)
+    df = chunks[0] if len(chunks) == 1 else pd.concat(chunks, ignore_index=True)
+    _downcast_numeric(df)
+    _categorize_tags(df)
+    return df
+
+
+def get_entries_iter(conn: sqlite3.Connection, year: int | None = None,
+                     start_date: str | None = None, end_date: str | None = None,
+                     columns: list[str] | None = None, tag: str | None = None,
+                     month: int | None = None, project_contains: str | None = None,
+                     chunksize: int = 50_000):
+    """
+    Yield the entries get_entries_df would return as DataFrames of at most
+    chunksize rows, each post-processed the same way. For callers that only
+    accumulate (sums, counts) and never need the whole table in memory.
+    Category codes of 'tags' are per chunk, so don't concat chunks expecting
+    a shared categorical.
+    """
+    project_names = _projects_containing(conn, project_contains) if project_contains else None
+    col_expr, where, params = _entry_select(
+        year, start_date, end_date, columns, tag, month, project_names
+    )
+    query = f"SELECT {col_expr} FROM time_entries WHERE {where} ORDER BY start ASC"
+    for chunk in _iter_frames(conn, query, params, chunksize):
+        _parse_start(chunk)
+        _downcast_numeric(chunk)
+        _categorize_tags(chunk)
+        yield chunk
+
+
+# Process-wide snapshot of every completed entry, reused by unfiltered-by-tag
+# get_entries_df calls until the data changes (see _data_epoch)
+_snapshot_lock = threading.Lock()
+_snapshot: tuple[tuple, pd.DataFrame] | None = None
+
+
+def _entries_snapshot(conn: sqlite3.Connection) -> pd.DataFrame:
+    """Return the cached full entry frame, reloading it once after any write or sync."""
+    global _snapshot
+    key = _data_epoch(conn)
+    with _snapshot_lock:
+        if _snapshot is None or _snapshot[0] != key:
+            col_expr = ", ".join(["*", *_DERIVED_COLUMNS.values()])
+            _snapshot = (key, _query_entries(conn, col_expr, "duration > 0", []))
+        return _snapshot[1]
+
+
 def get_entries_df(conn: sqlite3.Connection, year: int | None = None,
                    start_date: str | None = None, end_date: str | None = None,
-                   columns: list[str] | None = None) -> pd.DataFrame:
+                   columns: list[str] | None = None,
+                   tag: str | None = None, month: int | None = None,
+                   project_contains: str | None = None) -> pd.DataFrame:
     """
     Return time entries as a Pandas DataFrame, optionally filtered.
     This is the main query method used by all UI pages.
     Pass `columns` to select specific columns instead of `*`.
+    Pass `tag` to keep only entries carrying that tag name; the match runs in
+    SQL through entry_tags so non-matching rows never reach pandas.
+    Without `tag`, rows are sliced from an in-memory snapshot of the table
+    that is only re-read after a write or sync.
+    `month` keeps one calendar month (of every year unless `year` is given);
+    `project_contains` keeps projects whose name contains it, ignoring case.
+    The 'start' column comes back as naive datetime64 holding the wall-clock
+    time as logged (the UTC offset is dropped), parsed once here for all pages.
+    'year_month' ("2024-03") is derived by SQLite; request it in `columns` by name.
+    Numeric columns are narrowed per NUMERIC_DTYPES (float32 hours, int16 dates).
+    'tags' stays the raw JSON string, as a category; use decode_tags() or
+    has_tag() when the lists are actually needed.
     """
-    col_expr = ", ".join(columns) if columns else "*"
-    query = f"SELECT {col_expr} FROM time_entries WHERE duration > 0"
-    params: list = []
+    project_names = _projects_containing(conn, project_contains) if project_contains else None
+    if tag:
+        return _query_entries(conn, *_entry_select(
+            year, start_date, end_date, columns, tag, month, project_names
+        ))
 
+    df = _entries_snapshot(conn)
+    if df.empty:
+        return df.copy()
+    mask = pd.Series(True, index=df.index)
     if year:
-        query += " AND start_year = ?"
-        params.append(year)
+        mask &= df["start_year"] == year
     if start_date:
-        query += " AND start_date >= ?"
-        params.append(start_date)
+        mask &= df["start_date"] >= start_date
     if end_date:
-        query += " AND start_date <= ?"
-        params.append(end_date)
+        mask &= df["start_date"] <= end_date
+    if month:
+        mask &= df["start_month"] == month
+    if project_names is not None:
+        mask &= df["project_name"].isin(project_names)
+    if columns:
+        df = df[list(columns)]
+    return df[mask].reset_index(drop=True)
 
-    query += " ORDER BY start ASC"
-    df = pd.read_sql_query(query, conn, params=params)
 
-    _attach_tags_list(df)
+# ---------------------------------------------------------------------------
+# Aggregation helpers -- grouped in SQL so only one row per group reaches pandas.
+# All take the same year / start_date / end_date filter as get_entries_df.
+# ---------------------------------------------------------------------------
 
-    return df
+def get_overview(conn: sqlite3.Connection, year: int | None = None,
+                 start_date: str | None = None, end_date: str | None = None) -> dict:
+    """
+    Headline numbers for a filter in one SQL pass:
+    total_hours, total_entries, unique_projects, unique_days.
+    """
+    where, params = _entry_filter_sql(year, start_date, end_date)
+    row = conn.execute(
+        f"SELECT COALESCE(SUM(duration_hours), 0) AS total_hours, "
+        f"COUNT(*) AS total_entries, "
+        f"COUNT(DISTINCT project_name) AS unique_projects, "
+        f"COUNT(DISTINCT start_date) AS unique_days "
+        f"FROM time_entries WHERE {where}",
+        params,
+    ).fetchone()
+    return dict(row)
 
 
+def get_year_stats_multi(conn: sqlite3.Connection, years: list[int]) -> dict[int, dict]:
+    """
+    get_overview's numbers for several years in one GROUP BY pass, keyed by
+    year. Years without entries are absent from the result.
+    """
+    placeholders = ", ".join("?" for _ in years)
+    rows = conn.execute(
+        f"SELECT start_year, SUM(duration_hours) AS total_hours, "
+        f"COUNT(*) AS total_entries, "
+        f"COUNT(DISTINCT project_name) AS unique_projects, "
+        f"COUNT(DISTINCT start_date) AS unique_days "
+        f"FROM time_entries WHERE duration > 0 AND start_year IN ({placeholders}) "
+        f"GROUP BY start_year",
+        list(years),
+    ).fetchall()
+    return {r["start_year"]: dict(r) for r in rows}
+
+
+def get_project_hours(conn: sqlite3.Connection, year: int | None = None,
+                      start_date: str | None = None, end_date: str | None = None,
+                      limit: int | None = None) -> pd.DataFrame:
+    """
+    Hours and entry count per project_name, largest first (the top `limit`
+    if given). Columns: project_name, hours, entries.
+    """
+    where, params = _entry_filter_sql(year, start_date, end_date)
+    query = (
+        f"SELECT project_name, SUM(duration_hours) AS hours, COUNT(*) AS entries "
+        f"FROM time_entries WHERE {where} GROUP BY project_name ORDER BY hours DESC"
+    )
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def get_tag_hours(conn: sqlite3.Connection, year: int | None = None,
+                  start_date: str | None = None, end_date: str | None = None,
+                  limit: int | None = None) -> pd.DataFrame:
+    """
+    Hours and entry count per tag name, largest first (the top `limit` if
+    given). Columns: tag, hours, entries.
+    Unnests the JSON 'tags' array with json_each, so no exploded rows are built.
+    (Not entry_tags: it also lists each entry under the current name of its
+    tag_ids, so a renamed tag would count the entry twice.)
+    """
+    where, params = _entry_filter_sql(year, start_date, end_date)
+    query = (
+        f"SELECT j.value AS tag, SUM(duration_hours) AS hours, COUNT(*) AS entries "
+        f"FROM time_entries, json_each(time_entries.tags) AS j "
+        f"WHERE {where} AND json_valid(time_entries.tags) AND j.value != '' "
+        f"GROUP BY j.value ORDER BY hours DESC"
+    )
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def get_daily_hours(conn: sqlite3.Connection, year: int | None = None,
+                    start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+    """Hours per calendar day, oldest first. Columns: start_date, hours."""
+    where, params = _entry_filter_sql(year, start_date, end_date)
+    return pd.read_sql_query(
+        f"SELECT start_date, SUM(duration_hours) AS hours FROM time_entries "
+        f"WHERE {where} GROUP BY start_date ORDER BY start_date",
+        conn, params=params,
+    )
+
+
+def get_monthly_hours(conn: sqlite3.Connection, year: int | None = None,
+                      start_date: str | None = None, end_date: str | None = None) -> pd.DataFrame:
+    """Hours per "YYYY-MM" month, oldest first. Columns: year_month, hours."""
+    where, params = _entry_filter_sql(year, start_date, end_date)
+    return pd.read_sql_query(
+        f"SELECT SUBSTR(start_date, 1, 7) AS year_month, SUM(duration_hours) AS hours "
+        f"FROM time_entries WHERE {where} GROUP BY year_month ORDER BY year_month",
+        conn, params=params,
+    )
+
+
+def get_monthly_totals(conn: sqlite3.Connection, year: int) -> pd.Series:
+    """Hours per calendar month (1-12) of one year; months without entries are 0."""
+    where, params = _entry_filter_sql(year)
+    df = pd.read_sql_query(
+        f"SELECT start_month, SUM(duration_hours) AS hours FROM time_entries "
+        f"WHERE {where} GROUP BY start_month",
+        conn, params=params,
+    )
+    return df.set_index("start_month")["hours"].reindex(range(1, 13), fill_value=0)
+
+
+def get_description_stats(conn: sqlite3.Connection, year: int | None = None,
+                          start_date: str | None = None, end_date: str | None = None,
+                          limit: int | None = None) -> pd.DataFrame:
+    """
+    Entry count and hours per non-empty description, most hours first.
+    Columns: description, entries, total_hours.
+    """
+    where, params = _entry_filter_sql(year, start_date, end_date)
+    query = (
+        f"SELECT description, COUNT(*) AS entries, SUM(duration_hours) AS total_hours "
+        f"FROM time_entries WHERE {where} AND description IS NOT NULL AND description != '' "
+        f"GROUP BY description ORDER BY total_hours DESC"
+    )
+    if limit:
+        query += " LIMIT ?"
+        params.append(limit)
+    return pd.read_sql_query(query, conn, params=params)
+
+
+def get_date_across_years_summary(conn: sqlite3.Connection, month: int, day: int) -> pd.DataFrame:
+    """
+    One row per year for a month/day: hours, entries, the project with the most
+    hours (ties by name) and the description of the longest entry.
+    Columns: start_year, hours, entries, top_project, top_desc.
+    """
+    query = """
+        WITH e AS (
+            SELECT start_year, start, project_name, description, duration_hours
+            FROM time_entries
+            WHERE start_month = ? AND start_day = ? AND duration > 0
+        ),
+        proj AS (
+            SELECT start_year, project_name,
+                   ROW_NUMBER() OVER (PARTITION BY start_year
+                                      ORDER BY SUM(duration_hours) DESC, project_name) AS rn
+            FROM e WHERE project_name IS NOT NULL
+            GROUP BY start_year, project_name
+        ),
+        longest AS (
+            SELECT start_year, description,
+                   ROW_NUMBER() OVER (PARTITION BY start_year
+                                      ORDER BY duration_hours DESC, start) AS rn
+            FROM e
+        )
+        SELECT y.start_year, y.hours, y.entries,
+               proj.project_name AS top_project, longest.description AS top_desc
+        FROM (SELECT start_year, SUM(duration_hours) AS hours, COUNT(*) AS entries
+              FROM e GROUP BY start_year) y
+        LEFT JOIN proj ON proj.start_year = y.start_year AND proj.rn = 1
+        LEFT JOIN longest ON longest.start_year = y.start_year AND longest.rn = 1
+        ORDER BY y.start_year
+    """
+    return _read_frame(conn, query, [month, day])
+
+
+def get_week_summary(conn: sqlite3.Connection, week: int) -> pd.DataFrame:
+    """Hours and entries per year for one ISO week number. Columns: start_year, hours, entries."""
+    return _read_frame(
+        conn,
+        "SELECT start_year, SUM(duration_hours) AS hours, COUNT(*) AS entries "
+        "FROM time_entries WHERE start_week = ? AND duration > 0 "
+        "GROUP BY start_year ORDER BY start_year",
+        [week],
+    )
+
+
+def has_highlights_this_week(conn: sqlite3.Connection, start_date: str, end_date: str,
+                             tag: str = "Highlight") -> bool:
+    """
+    Cheap existence probe: True if any entry between start_date and end_date
+    (inclusive) carries `tag`. Lets the homepage skip loading a DataFrame
+    for a week with nothing to show.
+    """
+    row = conn.execute(
+        "SELECT 1 FROM entry_tags et JOIN time_entries te ON te.id = et.entry_id "
+        "WHERE et.tag_name = ? AND te.start_date BETWEEN ? AND ? AND te.duration > 0 LIMIT 1",
+        (tag, start_date, end_date),
+    ).fetchone()
+    return row is not None
+
 
 def get_available_years(conn: sqlite3.Connection) -> list[int]:
     """Return sorted list of years that have data."""
-    rows = conn.execute(
-        "SELECT DISTINCT start_year FROM time_entries WHERE start_year IS NOT NULL ORDER BY start_year"
-    ).fetchall()
-    return [r["start_year"] for r in rows]
+    return list(_cached_column_values(
+        _data_epoch(conn),
+        "SELECT DISTINCT start_year FROM time_entries WHERE start_year IS NOT NULL ORDER BY start_year",
+    ))
+
+
+def get_year_bounds(conn: sqlite3.Connection) -> tuple[int, int] | None:
+    """Return (min_year, max_year) of the stored entries, or None if empty. Index-only lookup."""
+    row = conn.execute(
+        "SELECT MIN(start_year) AS lo, MAX(start_year) AS hi FROM time_entries"
+    ).fetchone()
+    if row is None or row["lo"] is None:
+        return None
+    return int(row["lo"]), int(row["hi"])
 
 
 def get_projects_df(conn: sqlite3.Connection) -> pd.DataFrame:
@@ -480,8 +1324,7 @@ def get_projects_df(conn: sqlite3.Connection) -> pd.DataFrame:
 
 
 def get_tags_list(conn: sqlite3.Connection) -> list[str]:
-    rows = conn.execute("SELECT DISTINCT name FROM tags ORDER BY name").fetchall()
-    return [r["name"] for r in rows]
+    return list(_cached_column_values(_data_epoch(conn), _TAG_NAMES_SQL))
 
 
 def get_clients_df(conn: sqlite3.Connection) -> pd.DataFrame:
@@ -499,44 +1342,43 @@ def get_tasks_df(conn: sqlite3.Connection, project_id: int | None = None) -> pd.
     return pd.read_sql_query("SELECT * FROM tasks ORDER BY name", conn)
 
 
-def get_entries_for_date_across_years(conn: sqlite3.Connection, month: int, day: int) -> pd.DataFrame:
+def get_entries_for_date_across_years(conn: sqlite3.Connection, month: int, day: int,
+                                      columns: tuple[str, ...] = DEFAULT_COLS) -> pd.DataFrame:
     """Get all entries that occurred on a specific month/day across all years (for retrospect)."""
-    query = """
-        SELECT * FROM time_entries
+    query = f"""
+        SELECT {_select_list(columns)} FROM time_entries
         WHERE start_month = ? AND start_day = ? AND duration > 0
         ORDER BY start_year ASC, start ASC
     """
-    df = pd.read_sql_query(query, conn, params=[month, day])
-    _attach_tags_list(df)
+    df = _read_frame(conn, query, [month, day])
+    _parse_start(df)
+    _categorize_tags(df)
     return df
 
 
-def get_entries_for_week_across_years(conn: sqlite3.Connection, week: int) -> pd.DataFrame:
+def get_entries_for_week_across_years(conn: sqlite3.Connection, week: int,
+                                      columns: tuple[str, ...] = DEFAULT_COLS) -> pd.DataFrame:
     """Get all entries for a specific ISO week number across all years."""
-    query = """
-        SELECT * FROM time_entries
+    query = f"""
+        SELECT {_select_list(columns)} FROM time_entries
         WHERE start_week = ? AND duration > 0
         ORDER BY start_year ASC, start ASC
     """
-    df = pd.read_sql_query(query, conn, params=[week])
-    _attach_tags_list(df)
+    df = _read_frame(conn, query, [week])
+    _parse_start(df)
+    _categorize_tags(df)
     return df
 
 
 def get_total_stats(conn: sqlite3.Connection) -> dict:
-    """Quick aggregate stats across all data."""
-    row = conn.execute("""
-        SELECT
-            COUNT(*) as total_entries,
-            SUM(duration_hours) as total_hours,
-            MIN(start_date) as earliest_date,
-            MAX(start_date) as latest_date,
-            COUNT(DISTINCT CASE WHEN project_name != '' THEN project_name END) as unique_projects,
-            COUNT(DISTINCT start_year) as years_tracked
-        FROM time_entries
-        WHERE duration > 0
-    """).fetchone()
-    return dict(row)
+    """
+    Quick aggregate stats across all data, read from stats_cache.
+    Falls back to a full scan if the cache hasn't been filled yet.
+    """
+    cached = dict(conn.execute("SELECT key, value FROM stats_cache").fetchall())
+    if set(_TOTAL_STATS_KEYS) <= cached.keys():
+        return {k: cached[k] for k in _TOTAL_STATS_KEYS}
+    return dict(conn.execute(_TOTAL_STATS_SQL).fetchone())
 
 
 def get_enrichment_stats(conn: sqlite3.Connection) -> dict:
@@ -566,79 +1408,117 @@ def get_enrichment_stats(conn: sqlite3.Connection) -> dict:
     return result
 
 
-def search_entries(conn: sqlite3.Connection, keyword: str, limit: int = 200) -> pd.DataFrame:
-    """Search entries by description, project name, or tags."""
-    query = """
-        SELECT * FROM time_entries
-        WHERE (description LIKE ? OR project_name LIKE ? OR tags LIKE ?)
-          AND duration > 0
-        ORDER BY start DESC
-        LIMIT ?
+def _search_source(keyword: str) -> tuple[str, list]:
+    """
+    FROM/WHERE clause (time_entries aliased te) + params shared by the search
+    readers. Uses the entries_fts trigram index; keywords shorter than three
+    characters can't form a trigram and fall back to LIKE.
     """
+    if len(keyword) >= 3:
+        # Quoted as one FTS5 phrase so operators and punctuation are literal
+        phrase = '"' + keyword.replace('"', '""') + '"'
+        return (
+            "entries_fts JOIN time_entries te ON te.id = entries_fts.rowid "
+            "WHERE entries_fts MATCH ? AND te.duration > 0",
+            [phrase],
+        )
     pattern = f"%{keyword}%"
-    df = pd.read_sql_query(query, conn, params=[pattern, pattern, pattern, limit])
-    _attach_tags_list(df)
+    return (
+        "time_entries te "
+        "WHERE (te.description LIKE ? OR te.project_name LIKE ? OR te.tags LIKE ?) "
+        "AND te.duration > 0",
+        [pattern, pattern, pattern],
+    )
+
+
+def search_entries(conn: sqlite3.Connection, keyword: str, limit: int = 200,
+                   columns: tuple[str, ...] = DEFAULT_COLS) -> pd.DataFrame:
+    """
+    Search entries by description, project name, or tags (case-insensitive
+    substring match), most recent first.
+    """
+    source, params = _search_source(keyword)
+    query = f"""
+        SELECT {_select_list(columns, "te")} FROM {source}
+        ORDER BY te.start_ts DESC
+        LIMIT ?
+    """
+    df = _read_frame(conn, query, params + [limit])
+    _categorize_tags(df)
 
     return df
 
 
+def get_search_totals(conn: sqlite3.Connection, keyword: str) -> dict:
+    """Entry count and total hours over every search_entries match (no limit)."""
+    source, params = _search_source(keyword)
+    row = conn.execute(
+        f"SELECT COUNT(*), COALESCE(SUM(te.duration_hours), 0) FROM {source}", params
+    ).fetchone()
+    return {"entries": row[0], "hours": row[1]}
+
+
 def get_entries_by_tag(conn: sqlite3.Connection, tag_name: str,
-                       year: int | None = None) -> pd.DataFrame:
+                       year: int | None = None,
+                       columns: tuple[str, ...] = DEFAULT_COLS) -> pd.DataFrame:
     """
-    Get all entries containing a specific tag.
-    Primary: JSON name search on the tags column.
-    Fallback: look up the tag's integer ID and search tag_ids for entries
-    that the name search would miss (e.g. renamed tags).
+    Get all entries containing a specific tag (case-insensitive).
+    An indexed lookup through entry_tags, which also holds the current name of
+    every tag in tag_ids, so entries logged under a renamed tag are included.
     """
-    # Resolve tag ID for fallback search
-    tag_row = conn.execute(
-        "SELECT id FROM tags WHERE name = ? COLLATE NOCASE", (tag_name,)
-    ).fetchone()
-    tag_id_pattern = ""
-    if tag_row:
-        tag_id_pattern = f"%{tag_row['id']}%"
-
-    if tag_id_pattern:
-        query = (
-            "SELECT * FROM time_entries "
-            "WHERE (tags LIKE ? OR tag_ids LIKE ?) AND duration > 0"
-        )
-        params: list = [f'%"{tag_name}"%', tag_id_pattern]
-    else:
-        query = "SELECT * FROM time_entries WHERE tags LIKE ? AND duration > 0"
-        params = [f'%"{tag_name}"%']
+    query = (
+        f"SELECT {_select_list(columns, 'te')} FROM time_entries te JOIN entry_tags et ON et.entry_id = te.id "
+        "WHERE et.tag_name = ? AND te.duration > 0"
+    )
+    params: list = [tag_name]
 
     if year:
         query += " AND start_year = ?"
         params.append(year)
     query += " ORDER BY start DESC"
-    df = pd.read_sql_query(query, conn, params=params)
-    _attach_tags_list(df)
+    df = _read_frame(conn, query, params)
+    _categorize_tags(df)
 
     return df
 
 
+_PROJECT_NAMES_SQL = (
+    "SELECT DISTINCT project_name FROM time_entries "
+    "WHERE project_name != '' AND project_name IS NOT NULL "
+    "ORDER BY project_name"
+)
+_TAG_NAMES_SQL = "SELECT DISTINCT name FROM tags ORDER BY name"
+_CLIENT_NAMES_SQL = (
+    "SELECT DISTINCT client_name FROM time_entries "
+    "WHERE client_name != '' AND client_name IS NOT NULL "
+    "ORDER BY client_name"
+)
+
+
 def get_all_project_names(conn: sqlite3.Connection) -> list[str]:
     """Return sorted list of distinct non-empty project names from time entries."""
-    rows = conn.execute(
-        "SELECT DISTINCT project_name FROM time_entries "
-        "WHERE project_name != '' AND project_name IS NOT NULL "
-        "ORDER BY project_name"
-    ).fetchall()
-    return [r["project_name"] for r in rows]
+    return list(_cached_column_values(_data_epoch(conn), _PROJECT_NAMES_SQL))
 
 
 def get_all_tag_names(conn: sqlite3.Connection) -> list[str]:
     """Return sorted list of distinct tag names used in time entries."""
-    rows = conn.execute("SELECT DISTINCT name FROM tags ORDER BY name").fetchall()
-    return [r["name"] for r in rows]
+    return list(_cached_column_values(_data_epoch(conn), _TAG_NAMES_SQL))
 
 
 def get_all_client_names(conn: sqlite3.Connection) -> list[str]:
     """Return sorted list of distinct non-empty client names from time entries."""
-    rows = conn.execute(
-        "SELECT DISTINCT client_name FROM time_entries "
-        "WHERE client_name != '' AND client_name IS NOT NULL "
-        "ORDER BY client_name"
-    ).fetchall()
-    return [r["client_name"] for r in rows]
+    return list(_cached_column_values(_data_epoch(conn), _CLIENT_NAMES_SQL))
+
+
+def get_known_names(conn: sqlite3.Connection) -> dict[str, list[str]]:
+    """
+    The project, tag and client name lists in one call (the chat vocabulary),
+    sharing a single _data_epoch() read. Served from memory until the next
+    write or sync.
+    """
+    epoch = _data_epoch(conn)
+    return {
+        "projects": list(_cached_column_values(epoch, _PROJECT_NAMES_SQL)),
+        "tags": list(_cached_column_values(epoch, _TAG_NAMES_SQL)),
+        "clients": list(_cached_column_values(epoch, _CLIENT_NAMES_SQL)),
+    }
@@ -9,14 +9,15 @@ by an actual AI API later.
 import re
 import json
 from datetime import date, datetime, timedelta
+from functools import lru_cache
 
 import pandas as pd
 
 from src.data_store import (
-    managed_connection, get_entries_df, get_entries_for_date_across_years,
-    get_entries_for_week_across_years, get_total_stats, get_available_years,
-    search_entries, get_entries_by_tag, get_all_project_names, get_all_tag_names,
-    get_all_client_names,
+    get_reader_conn, get_entries_df, get_date_across_years_summary, get_week_summary,
+    get_total_stats, get_available_years,
+    search_entries, get_search_totals, get_entries_by_tag, get_known_names, get_overview,
+    get_tag_hours, get_year_stats_multi, get_project_hours,
 )
 
 # Month name -> number mapping
@@ -27,19 +28,63 @@ MONTH_MAP = {
     "october": 10, "oct": 10, "november": 11, "nov": 11, "december": 12, "dec": 12,
 }
 
+# Question patterns, compiled once at import (tried in _dispatch_question order)
+_RE_YEAR = re.compile(r'\b(20\d{2})\b')
+_RE_CLIENT = re.compile(r'(?:client)\s+["\']?(.+?)["\']?(?:\s+in\s+(20\d{2}))?$')
+_RE_TASK = re.compile(r'(?:task)\s+["\']?(.+?)["\']?(?:\s+in\s+(20\d{2}))?$')
+_RE_TAG = re.compile(r'(?:tagged|tag)\s+["\']?(.+?)["\']?(?:\s+in\s+(20\d{2}))?$')
+_RE_DATE = re.compile(r'(?:on|for)\s+(?:(\w+)\s+(\d{1,2})(?:st|nd|rd|th)?(?:[,\s]+(\d{4}))?)')
+_RE_WEEK = re.compile(r'week\s*(\d{1,2})')
+_RE_COMPARE = re.compile(r'(?:compare\s+)?(20\d{2})\s+(?:and|vs|to|with|versus)\s+(20\d{2})')
+_RE_MONTH = re.compile(r'(?:in|last|for)\s+(\w+)(?:\s+(20\d{2}))?')
+_RE_PROJECT = re.compile(r'(?:project)\s+["\']?(.+?)["\']?(?:\s+in\s+(20\d{2}))?$')
+_RE_SEARCH = re.compile(r'(?:search|find|look for|when did i)\s+(.+)')
+
+
+@lru_cache(maxsize=8)
+def _name_index(names: tuple[str, ...]) -> tuple[dict, tuple, dict, re.Pattern | None, dict]:
+    """
+    Lookup structures for one name list, built once per vocabulary:
+    lowercase name -> first position, (name, lowercase) pairs, and a single
+    overlapping-lookahead regex over every lowercase name (longest first).
+    rank maps a lowercase name to the earliest position among it and the
+    names that are its prefixes, since those match at the same spot but the
+    regex only reports the longest. exact maps a lowercase, right-stripped
+    name to the first name it came from (whole-question matches).
+    """
+    first: dict[str, int] = {}
+    exact: dict[str, str] = {}
+    for i, n in enumerate(names):
+        first.setdefault(n.lower(), i)
+        exact.setdefault(n.lower().rstrip(), n)
+    lowered = tuple((n, n.lower()) for n in names)
+    rank = {low: min(j for p, j in first.items() if low.startswith(p)) for low in first}
+    alternation = "|".join(re.escape(low) for low in sorted(first, key=len, reverse=True))
+    scan = re.compile(f"(?=({alternation}))") if first else None
+    return first, lowered, rank, scan, exact
+
 
 def _fuzzy_match(name: str, candidates: list[str]) -> str | None:
     """Case-insensitive match of user input against a list of known names."""
+    first, lowered, _, _, _ = _name_index(tuple(candidates))
     lower = name.lower().strip()
-    for c in candidates:
-        if c.lower() == lower:
-            return c
-    for c in candidates:
-        if lower in c.lower() or c.lower() in lower:
+    if lower in first:
+        return candidates[first[lower]]
+    for c, c_lower in lowered:
+        if lower in c_lower or c_lower in lower:
             return c
     return None
 
 
+def _first_name_in(q: str, names: list[str]) -> str | None:
+    """The earliest name in `names` whose lowercase form occurs in q, via one regex scan."""
+    _, _, rank, scan, _ = _name_index(tuple(names))
+    if scan is None:
+        return None
+    best = min((rank[m.group(1)] for m in scan.finditer(q)), default=None)
+    return names[best] if best is not None else None
+
+
 def answer_question(question: str) -> str:
     """
     Parse a natural language question and return an answer string.
@@ -47,164 +92,226 @@ def answer_question(question: str) -> str:
     """
     q = question.lower().strip()
 
-    with managed_connection() as conn:
-        return _dispatch_question(q, conn)
+    return _dispatch_question(q, get_reader_conn())
+
+
+def _year_in(q: str) -> int | None:
+    """The first 20xx year mentioned in the question, if any."""
+    year_match = _RE_YEAR.search(q)
+    return int(year_match.group(1)) if year_match else None
+
+
+# ---------------------------------------------------------------------------
+# Intent handlers. Each returns an answer, or None to let the next intent try.
+# `known` holds the project / tag / client name lists.
+# ---------------------------------------------------------------------------
+
+def _intent_client(q: str, conn, known: dict) -> str | None:
+    """client-specific queries: "client X", "how much time on client X"."""
+    client_match = _RE_CLIENT.search(q)
+    if not client_match:
+        return None
+    client_name = client_match.group(1).strip()
+    year_val = int(client_match.group(2)) if client_match.group(2) else None
+    matched_client = _fuzzy_match(client_name, known["clients"])
+    if matched_client:
+        return _answer_client(conn, matched_client, year_val)
+    return f"No client matching '{client_name}'. Known clients: {', '.join(known['clients'])}"
+
+
+def _intent_task(q: str, conn, known: dict) -> str | None:
+    """task-specific queries: "task X", "hours on task X"."""
+    task_match = _RE_TASK.search(q)
+    if not task_match:
+        return None
+    task_name = task_match.group(1).strip()
+    year_val = int(task_match.group(2)) if task_match.group(2) else None
+    return _answer_task(conn, task_name, year_val)
+
+
+def _intent_tag(q: str, conn, known: dict) -> str | None:
+    """tag-specific queries: "tagged X", "tag X", "hours on tag X"."""
+    tag_match = _RE_TAG.search(q)
+    if not tag_match:
+        return None
+    tag_name = tag_match.group(1).strip()
+    year_val = int(tag_match.group(2)) if tag_match.group(2) else None
+    matched_tag = _fuzzy_match(tag_name, known["tags"])
+    if matched_tag:
+        return _answer_tag(conn, matched_tag, year_val)
+    return f"No tag matching '{tag_name}' found. Known tags: {', '.join(known['tags'])}"
+
+
+def _intent_date(q: str, conn, known: dict) -> str | None:
+    """"what did I do on <date>"."""
+    date_match = _RE_DATE.search(q)
+    if not date_match:
+        return None
+    month_str, day_str, year_str = date_match.groups()
+    month_num = MONTH_MAP.get(month_str.lower())
+    if not month_num:
+        return None
+    day_num = int(day_str)
+    if year_str:
+        return _answer_specific_date(conn, int(year_str), month_num, day_num)
+    return _answer_date_across_years(conn, month_num, day_num)
+
+
+def _intent_week_number(q: str, conn, known: dict) -> str | None:
+    """"week <n>"."""
+    week_match = _RE_WEEK.search(q)
+    if not week_match:
+        return None
+    return _answer_week(conn, int(week_match.group(1)))
+
+
+def _intent_compare(q: str, conn, known: dict) -> str | None:
+    """compare years: "compare 2023 and 2024" or "2023 vs 2024"."""
+    compare_match = _RE_COMPARE.search(q)
+    if not compare_match:
+        return None
+    return _answer_compare(conn, int(compare_match.group(1)), int(compare_match.group(2)))
+
+
+def _intent_totals(q: str, conn, known: dict) -> str:
+    """"total" / "overall" / "all time" -- scoped to a named project, tag or client if one appears."""
+    proj = _first_name_in(q, known["projects"])
+    if proj is not None:
+        return _answer_project(conn, proj, _year_in(q))
+    tag = _first_name_in(q, known["tags"])
+    if tag is not None:
+        return _answer_tag(conn, tag, _year_in(q))
+    cl = _first_name_in(q, known["clients"])
+    if cl is not None:
+        return _answer_client(conn, cl, _year_in(q))
+    return _answer_totals(conn)
+
+
+def _intent_month(q: str, conn, known: dict) -> str | None:
+    """"last <month>" or "in <month> <year>"."""
+    month_match = _RE_MONTH.search(q)
+    if not month_match:
+        return None
+    month_num = MONTH_MAP.get(month_match.group(1).lower())
+    if not month_num:
+        return None
+    year_val = int(month_match.group(2)) if month_match.group(2) else None
+    return _answer_month(conn, month_num, year_val)
+
+
+def _intent_year(q: str, conn, known: dict) -> str | None:
+    """year-specific questions: "how was 2024"."""
+    year_val = _year_in(q)
+    return _answer_year(conn, year_val) if year_val else None
+
+
+def _intent_project(q: str, conn, known: dict) -> str | None:
+    """explicit "project X" prefix."""
+    project_match = _RE_PROJECT.search(q)
+    if not project_match:
+        return None
+    project_name = project_match.group(1).strip()
+    year_val = int(project_match.group(2)) if project_match.group(2) else None
+    matched = _fuzzy_match(project_name, known["projects"])
+    if matched:
+        return _answer_project(conn, matched, year_val)
+    return f"No project matching '{project_name}'. Known projects: {', '.join(known['projects'][:10])}..."
+
+
+def _intent_bare_project(q: str, conn, known: dict) -> str | None:
+    """bare project name: check if input matches a known project."""
+    proj = _name_index(tuple(known["projects"]))[4].get(q)
+    if proj is None:
+        return None
+    return _answer_project(conn, proj, None)
+
+
+def _intent_search(q: str, conn, known: dict) -> str | None:
+    """keyword search: "search X", "find X", "when did i X"."""
+    search_match = _RE_SEARCH.search(q)
+    if not search_match:
+        return None
+    keyword = search_match.group(1).strip().strip('"\'')
+    return _answer_search(conn, keyword)
+
+
+# Intents in priority order: (trigger phrases, handler). An intent is only
+# tried when one of its triggers occurs in the question (every handler's regex
+# needs one of them literally), and the first non-None answer wins. An empty
+# trigger tuple means "always try".
+_INTENTS = (
+    (("top project", "biggest project", "most project", "best project", "main project"),
+     lambda q, conn, known: _answer_top_projects(conn, _year_in(q))),
+    (("top tag", "biggest tag", "most tag", "best tag", "main tag", "what tag"),
+     lambda q, conn, known: _answer_top_tags(conn, _year_in(q))),
+    (("top task", "what task", "biggest task", "most task"),
+     lambda q, conn, known: _answer_top_tasks(conn, _year_in(q))),
+    (("client",), _intent_client),
+    (("task",), _intent_task),
+    (("tag",), _intent_tag),
+    (("on", "for"), _intent_date),
+    (("this week",),
+     lambda q, conn, known: _answer_week(conn, date.today().isocalendar()[1])),
+    (("last week",),
+     lambda q, conn, known: _answer_week(conn, (date.today() - timedelta(weeks=1)).isocalendar()[1])),
+    (("week",), _intent_week_number),
+    (("today",),
+     lambda q, conn, known: _answer_date_across_years(conn, date.today().month, date.today().day)),
+    (("yesterday",),
+     lambda q, conn, known: _answer_date_across_years(
+         conn, (date.today() - timedelta(days=1)).month, (date.today() - timedelta(days=1)).day)),
+    (("20",), _intent_compare),
+    (("total", "overall", "how much time", "all time", "lifetime"), _intent_totals),
+    (("in", "last", "for"), _intent_month),
+    (("20",), _intent_year),
+    (("project",), _intent_project),
+    ((), _intent_bare_project),
+    (("search", "find", "look for", "when did i"), _intent_search),
+)
+
+
+def _build_trigger_index() -> tuple[re.Pattern, dict[str, frozenset[int]]]:
+    """
+    One alternation over every trigger (longest first) plus, per trigger, the
+    intents it fires. The alternation sits in a lookahead so matches may
+    overlap and every start position is reported; at each position only the
+    longest trigger is, so a trigger also fires the intents of its own
+    prefixes ("last week" -> "last"). One finditer pass finds every intent.
+    """
+    owners: dict[str, set[int]] = {}
+    for i, (triggers, _) in enumerate(_INTENTS):
+        for t in triggers:
+            owners.setdefault(t, set()).add(i)
+    fires = {
+        t: frozenset().union(*(ids for p, ids in owners.items() if t.startswith(p)))
+        for t in owners
+    }
+    alternation = "|".join(re.escape(t) for t in sorted(owners, key=len, reverse=True))
+    pattern = re.compile(f"(?=({alternation}))")
+    return pattern, fires
+
+
+_RE_TRIGGERS, _TRIGGER_INTENTS = _build_trigger_index()
 
 
 def _dispatch_question(q: str, conn) -> str:
-    known_projects = get_all_project_names(conn)
-    known_tags = get_all_tag_names(conn)
-    known_clients = get_all_client_names(conn)
-
-    # ----- "top projects" / "top tags" / "biggest projects" -----
-    if any(kw in q for kw in ["top project", "biggest project", "most project",
-                               "best project", "main project"]):
-        year_match = re.search(r'\b(20\d{2})\b', q)
-        year_val = int(year_match.group(1)) if year_match else None
-        return _answer_top_projects(conn, year_val)
-
-    if any(kw in q for kw in ["top tag", "biggest tag", "most tag",
-                               "best tag", "main tag", "what tag"]):
-        year_match = re.search(r'\b(20\d{2})\b', q)
-        year_val = int(year_match.group(1)) if year_match else None
-        return _answer_top_tags(conn, year_val)
-
-    # ----- "top tasks" / "what tasks" -----
-    if any(kw in q for kw in ["top task", "what task", "biggest task", "most task"]):
-        year_match = re.search(r'\b(20\d{2})\b', q)
-        year_val = int(year_match.group(1)) if year_match else None
-        return _answer_top_tasks(conn, year_val)
-
-    # ----- client-specific queries: "client X", "how much time on client X" -----
-    client_match = re.search(
-        r'(?:client)\s+["\']?(.+?)["\']?(?:\s+in\s+(20\d{2}))?$', q
-    )
-    if client_match:
-        client_name = client_match.group(1).strip()
-        year_val = int(client_match.group(2)) if client_match.group(2) else None
-        matched_client = _fuzzy_match(client_name, known_clients)
-        if matched_client:
-            return _answer_client(conn, matched_client, year_val)
-        return f"No client matching '{client_name}'. Known clients: {', '.join(known_clients)}"
-
-    # ----- task-specific queries: "task X", "hours on task X" -----
-    task_match = re.search(
-        r'(?:task)\s+["\']?(.+?)["\']?(?:\s+in\s+(20\d{2}))?$', q
-    )
-    if task_match:
-        task_name = task_match.group(1).strip()
-        year_val = int(task_match.group(2)) if task_match.group(2) else None
-        return _answer_task(conn, task_name, year_val)
-
-    # ----- tag-specific queries: "tagged X", "tag X", "hours on tag X" -----
-    tag_match = re.search(
-        r'(?:tagged|tag)\s+["\']?(.+?)["\']?(?:\s+in\s+(20\d{2}))?$', q
-    )
-    if tag_match:
-        tag_name = tag_match.group(1).strip()
-        year_val = int(tag_match.group(2)) if tag_match.group(2) else None
-        matched_tag = _fuzzy_match(tag_name, known_tags)
-        if matched_tag:
-            return _answer_tag(conn, matched_tag, year_val)
-        return f"No tag matching '{tag_name}' found. Known tags: {', '.join(known_tags)}"
-
-    # ----- "what did I do on <date>" -----
-    date_match = re.search(
-        r'(?:on|for)\s+(?:(\w+)\s+(\d{1,2})(?:st|nd|rd|th)?(?:[,\s]+(\d{4}))?)',
-        q
-    )
-    if date_match:
-        month_str, day_str, year_str = date_match.groups()
-        month_num = MONTH_MAP.get(month_str.lower())
-        if month_num:
-            day_num = int(day_str)
-            if year_str:
-                return _answer_specific_date(conn, int(year_str), month_num, day_num)
-            else:
-                return _answer_date_across_years(conn, month_num, day_num)
-
-    # ----- "this week" / "last week" / "week <n>" -----
-    if "this week" in q:
-        week_num = date.today().isocalendar()[1]
-        return _answer_week(conn, week_num)
-    if "last week" in q:
-        week_num = (date.today() - timedelta(weeks=1)).isocalendar()[1]
-        return _answer_week(conn, week_num)
-    week_match = re.search(r'week\s*(\d{1,2})', q)
-    if week_match:
-        return _answer_week(conn, int(week_match.group(1)))
-
-    # ----- "today" / "yesterday" -----
-    if "today" in q:
-        today = date.today()
-        return _answer_date_across_years(conn, today.month, today.day)
-    if "yesterday" in q:
-        yesterday = date.today() - timedelta(days=1)
-        return _answer_date_across_years(conn, yesterday.month, yesterday.day)
-
-    # ----- compare years: "compare 2023 and 2024" or "2023 vs 2024" -----
-    compare_match = re.search(r'(?:compare\s+)?(20\d{2})\s+(?:and|vs|to|with|versus)\s+(20\d{2})', q)
-    if compare_match:
-        return _answer_compare(conn, int(compare_match.group(1)), int(compare_match.group(2)))
-
-    # ----- "total" / "overall" / "all time" -- but only if not scoped -----
-    if any(kw in q for kw in ["total", "overall", "how much time", "all time", "lifetime"]):
-        for proj in known_projects:
-            if proj.lower() in q:
-                year_match = re.search(r'\b(20\d{2})\b', q)
-                year_val = int(year_match.group(1)) if year_match else None
-                return _answer_project(conn, proj, year_val)
-        for tag in known_tags:
-            if tag.lower() in q:
-                year_match = re.search(r'\b(20\d{2})\b', q)
-                year_val = int(year_match.group(1)) if year_match else None
-                return _answer_tag(conn, tag, year_val)
-        for cl in known_clients:
-            if cl.lower() in q:
-                year_match = re.search(r'\b(20\d{2})\b', q)
-                year_val = int(year_match.group(1)) if year_match else None
-                return _answer_client(conn, cl, year_val)
-        return _answer_totals(conn)
-
-    # ----- "last <month>" or "in <month> <year>" -----
-    month_match = re.search(r'(?:in|last|for)\s+(\w+)(?:\s+(20\d{2}))?', q)
-    if month_match:
-        month_str = month_match.group(1).lower()
-        month_num = MONTH_MAP.get(month_str)
-        if month_num:
-            year_val = int(month_match.group(2)) if month_match.group(2) else None
-            return _answer_month(conn, month_num, year_val)
-
-    # ----- year-specific questions: "how was 2024" -----
-    year_match = re.search(r'\b(20\d{2})\b', q)
-    if year_match:
-        return _answer_year(conn, int(year_match.group(1)))
-
-    # ----- explicit "project X" prefix -----
-    project_match = re.search(
-        r'(?:project)\s+["\']?(.+?)["\']?(?:\s+in\s+(20\d{2}))?$', q
-    )
-    if project_match:
-        project_name = project_match.group(1).strip()
-        year_val = int(project_match.group(2)) if project_match.group(2) else None
-        matched = _fuzzy_match(project_name, known_projects)
-        if matched:
-            return _answer_project(conn, matched, year_val)
-        return f"No project matching '{project_name}'. Known projects: {', '.join(known_projects[:10])}..."
-
-    # ----- bare project name: check if input matches a known project -----
-    for proj in known_projects:
-        if proj.lower() == q or q == proj.lower().rstrip():
-            return _answer_project(conn, proj, None)
-
-    # ----- keyword search -----
-    search_match = re.search(r'(?:search|find|look for|when did i)\s+(.+)', q)
-    if search_match:
-        keyword = search_match.group(1).strip().strip('"\'')
-        return _answer_search(conn, keyword)
+    # Memoized in data_store until the next write or sync
+    known = get_known_names(conn)
+
+    # Single scan for every trigger phrase; only the intents it hits are tried
+    hit: set[int] = set()
+    for m in _RE_TRIGGERS.finditer(q):
+        hit |= _TRIGGER_INTENTS[m.group(1)]
+
+    for i, (triggers, handler) in enumerate(_INTENTS):
+        if triggers and i not in hit:
+            continue
+        answer = handler(q, conn, known)
+        if answer is not None:
+            return answer
 
     # ----- fallback -----
-    return _help_message(known_projects, known_tags)
+    return _help_message(known["projects"], known["tags"])
 
 
 def _answer_totals(conn) -> str:
@@ -257,10 +364,10 @@ def _answer_specific_date(conn, year: int, month: int, day: int) -> str:
 
     total_h = df["duration_hours"].sum()
     lines = []
-    for _, row in df.iterrows():
-        desc = row["description"] or "(no description)"
-        proj = row["project_name"] or "(no project)"
-        h = row["duration_hours"]
+    for row in df.itertuples(index=False):
+        desc = row.description or "(no description)"
+        proj = row.project_name or "(no project)"
+        h = row.duration_hours
         lines.append(f"- **{proj}** -- {desc} ({h:.1f}h)")
 
     entries_text = "\n".join(lines)
@@ -268,35 +375,25 @@ def _answer_specific_date(conn, year: int, month: int, day: int) -> str:
 
 
 def _answer_date_across_years(conn, month: int, day: int) -> str:
-    df = get_entries_for_date_across_years(conn, month, day)
-    if df.empty:
+    summary = get_date_across_years_summary(conn, month, day)
+    if summary.empty:
         return f"No entries found for {month:02d}-{day:02d} in any year."
 
     lines = []
-    for year_val in sorted(df["start_year"].unique()):
-        year_df = df[df["start_year"] == year_val]
-        total_h = year_df["duration_hours"].sum()
-        top_proj = year_df.groupby("project_name")["duration_hours"].sum().idxmax()
-        top_desc = year_df.sort_values("duration_hours", ascending=False).iloc[0]["description"] or ""
-        lines.append(f"- **{int(year_val)}:** {total_h:.1f}h -- top project: {top_proj or '(none)'}" +
+    for row in summary.itertuples(index=False):
+        top_desc = row.top_desc or ""
+        lines.append(f"- **{int(row.start_year)}:** {row.hours:.1f}h -- top project: {row.top_project or '(none)'}" +
                      (f", main activity: {top_desc}" if top_desc else ""))
 
     return f"**On {month:02d}/{day:02d} across all years:**\n\n" + "\n".join(lines)
 
 
 def _answer_month(conn, month: int, year: int | None) -> str:
+    # start_year / start_month are stored columns, so SQLite does the filtering
+    df = get_entries_df(conn, year=year, month=month)
     if year:
-        start = f"{year}-{month:02d}-01"
-        if month == 12:
-            end = f"{year}-12-31"
-        else:
-            end = f"{year}-{month+1:02d}-01"
-        df = get_entries_df(conn, start_date=start, end_date=end)
         label = f"{datetime(2000, month, 1).strftime('%B')} {year}"
     else:
-        # All years, this month
-        df = get_entries_df(conn)
-        df = df[df["start_month"] == month]
         label = f"{datetime(2000, month, 1).strftime('%B')} (all years)"
 
     if df.empty:
@@ -316,24 +413,21 @@ def _answer_month(conn, month: int, year: int | None) -> str:
 
 
 def _answer_week(conn, week_num: int) -> str:
-    df = get_entries_for_week_across_years(conn, week_num)
-    if df.empty:
+    summary = get_week_summary(conn, week_num)
+    if summary.empty:
         return f"No entries found for week {week_num}."
 
-    lines = []
-    for year_val in sorted(df["start_year"].unique()):
-        year_df = df[df["start_year"] == year_val]
-        total_h = year_df["duration_hours"].sum()
-        lines.append(f"- **{int(year_val)}:** {total_h:.1f}h ({len(year_df)} entries)")
+    lines = [
+        f"- **{int(row.start_year)}:** {row.hours:.1f}h ({row.entries} entries)"
+        for row in summary.itertuples(index=False)
+    ]
 
     return f"**Week {week_num} across all years:**\n\n" + "\n".join(lines)
 
 
 def _answer_project(conn, project_name: str, year: int | None) -> str:
-    df = get_entries_df(conn, year=year) if year else get_entries_df(conn)
-    # Case-insensitive match
-    mask = df["project_name"].str.lower().str.contains(project_name.lower(), na=False)
-    df = df[mask]
+    # Case-insensitive substring match, filtered inside get_entries_df
+    df = get_entries_df(conn, year=year, project_contains=project_name)
 
     if df.empty:
         return f"No entries found for project matching '{project_name}'."
@@ -393,55 +487,35 @@ def _answer_tag(conn, tag_name: str, year: int | None) -> str:
 
 
 def _answer_top_projects(conn, year: int | None) -> str:
-    df = get_entries_df(conn, year=year) if year else get_entries_df(conn)
-    if df.empty:
+    # Ranked and cut to ten rows in SQL; the overall total comes from the same filter
+    top = get_project_hours(conn, year=year, limit=10)
+    if top.empty:
         return "No data found."
 
-    top = (
-        df.groupby("project_name")
-        .agg(hours=("duration_hours", "sum"), entries=("id", "count"))
-        .sort_values("hours", ascending=False)
-        .head(10)
-        .reset_index()
-    )
-
-    total_h = df["duration_hours"].sum()
+    total_h = get_overview(conn, year=year)["total_hours"]
     scope = str(year) if year else "All Time"
     lines = []
-    for _, row in top.iterrows():
-        name = row["project_name"] or "(No Project)"
-        pct = (row["hours"] / total_h * 100) if total_h > 0 else 0
-        lines.append(f"  - **{name}:** {row['hours']:,.1f}h ({pct:.1f}%) -- {row['entries']} entries")
+    for row in top.itertuples(index=False):
+        name = row.project_name or "(No Project)"
+        pct = (row.hours / total_h * 100) if total_h > 0 else 0
+        lines.append(f"  - **{name}:** {row.hours:,.1f}h ({pct:.1f}%) -- {row.entries} entries")
 
     return f"**Top 10 Projects ({scope}):**\n\n" + "\n".join(lines)
 
 
 def _answer_top_tags(conn, year: int | None) -> str:
-    df = get_entries_df(conn, year=year) if year else get_entries_df(conn)
-    if df.empty:
-        return "No data found."
-
-    if "tags_list" not in df.columns:
-        return "No tag data available."
+    # Tag totals come from SQL (json_each), so no entry frame is loaded or exploded
+    top = get_tag_hours(conn, year=year, limit=10)
 
-    exploded = df.explode("tags_list")
-    exploded = exploded[exploded["tags_list"].notna() & (exploded["tags_list"] != "")]
-
-    if exploded.empty:
+    if top.empty:
+        if get_overview(conn, year=year)["total_entries"] == 0:
+            return "No data found."
         return "No tagged entries found."
 
-    top = (
-        exploded.groupby("tags_list")
-        .agg(hours=("duration_hours", "sum"), entries=("id", "count"))
-        .sort_values("hours", ascending=False)
-        .head(10)
-        .reset_index()
-    )
-
     scope = str(year) if year else "All Time"
     lines = []
-    for _, row in top.iterrows():
-        lines.append(f"  - **{row['tags_list']}:** {row['hours']:,.1f}h -- {row['entries']} entries")
+    for row in top.itertuples(index=False):
+        lines.append(f"  - **{row.tag}:** {row.hours:,.1f}h -- {row.entries} entries")
 
     return f"**Top Tags ({scope}):**\n\n" + "\n".join(lines)
 
@@ -528,63 +602,76 @@ def _answer_top_tasks(conn, year: int | None) -> str:
 
     scope = str(year) if year else "All Time"
     lines = []
-    for _, row in top.iterrows():
-        lines.append(f"  - **{row['task_name']}:** {row['hours']:,.1f}h -- {row['entries']} entries")
+    for row in top.itertuples(index=False):
+        lines.append(f"  - **{row.task_name}:** {row.hours:,.1f}h -- {row.entries} entries")
 
     return f"**Top Tasks ({scope}):**\n\n" + "\n".join(lines)
 
 
 def _answer_search(conn, keyword: str) -> str:
-    df = search_entries(conn, keyword, limit=20)
+    # Only the rows that get displayed; the header counts come from one aggregate
+    df = search_entries(conn, keyword, limit=10)
     if df.empty:
         return f"No entries found matching '{keyword}'."
 
-    total_h = df["duration_hours"].sum()
+    totals = get_search_totals(conn, keyword)
     lines = []
-    for _, row in df.head(10).iterrows():
-        d = row["start_date"]
-        desc = row["description"] or "(no description)"
-        proj = row["project_name"] or ""
-        h = row["duration_hours"]
+    for row in df.itertuples(index=False):
+        d = row.start_date
+        desc = row.description or "(no description)"
+        proj = row.project_name or ""
+        h = row.duration_hours
         lines.append(f"- **{d}** -- {desc} [{proj}] ({h:.1f}h)")
 
-    result = f"**Search results for '{keyword}'** ({len(df)} entries, {total_h:.1f}h total):\n\n"
+    result = (
+        f"**Search results for '{keyword}'** "
+        f"({totals['entries']} entries, {totals['hours']:.1f}h total):\n\n"
+    )
     result += "\n".join(lines)
-    if len(df) > 10:
-        result += f"\n\n...and {len(df) - 10} more entries."
+    if totals["entries"] > len(df):
+        result += f"\n\n...and {totals['entries'] - len(df)} more entries."
     return result
 
 
 def _answer_compare(conn, year_a: int, year_b: int) -> str:
-    df_a = get_entries_df(conn, year=year_a)
-    df_b = get_entries_df(conn, year=year_b)
+    by_year = get_year_stats_multi(conn, [year_a, year_b])
 
-    def stats(df, y):
-        if df.empty:
+    def stats(y):
+        row = by_year.get(y)
+        if row is None:
             return f"No data for {y}."
         return (
-            f"  - Hours: {df['duration_hours'].sum():,.1f}\n"
-            f"  - Entries: {len(df):,}\n"
-            f"  - Active days: {df['start_date'].nunique()}\n"
-            f"  - Projects: {df['project_name'].nunique()}"
+            f"  - Hours: {row['total_hours']:,.1f}\n"
+            f"  - Entries: {row['total_entries']:,}\n"
+            f"  - Active days: {row['unique_days']}\n"
+            f"  - Projects: {row['unique_projects']}"
         )
 
     return (
         f"**{year_a} vs {year_b}:**\n\n"
-        f"**{year_a}:**\n{stats(df_a, year_a)}\n\n"
-        f"**{year_b}:**\n{stats(df_b, year_b)}"
+        f"**{year_a}:**\n{stats(year_a)}\n\n"
+        f"**{year_b}:**\n{stats(year_b)}"
     )
 
 
 def _help_message(known_projects: list[str] | None = None,
                   known_tags: list[str] | None = None) -> str:
+    # Only the first names reach the text, so they alone key the cached build
+    projects = tuple(known_projects[:2]) if known_projects and len(known_projects) >= 2 else ()
+    tag = known_tags[0] if known_tags else None
+    return _help_text(projects, tag)
+
+
+@lru_cache(maxsize=16)
+def _help_text(projects: tuple[str, ...], tag: str | None) -> str:
+    """The help message for these example names, built once per distinct pair."""
     proj_examples = ""
-    if known_projects and len(known_projects) >= 2:
-        proj_examples = f' (e.g. "{known_projects[0]}", "{known_projects[1]}")'
+    if projects:
+        proj_examples = f' (e.g. "{projects[0]}", "{projects[1]}")'
 
     tag_examples = ""
-    if known_tags:
-        tag_examples = f' (e.g. "tag {known_tags[0]}")'
+    if tag is not None:
+        tag_examples = f' (e.g. "tag {tag}")'
 
     return (
         "I can answer questions about your Toggl time data. Try:\n\n"
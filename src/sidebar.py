@@ -0,0 +1,166 @@
+"""
+Shared sidebar: data sync controls rendered by the router on every page.
+
+Shows sync status, Quick / Full / Enriched sync buttons with progress bars,
+and enrichment coverage. Called once per rerun from app.py before pg.run().
+The Toggl client and sync runners are imported inside the button handlers so
+viewing a page never pays for the HTTP stack.
+"""
+
+import time
+from datetime import date
+
+import streamlit as st
+
+from src.sync import get_cached_sync_status
+from src.data_store import get_reader_conn, get_enrichment_stats
+
+
+def render_sync_sidebar():
+    """Render the sync status and sync controls in the sidebar."""
+    with st.sidebar:
+        _sync_panel()
+
+
+@st.fragment
+def _sync_panel():
+    """
+    Sidebar body, run as a fragment so widget clicks here rerun only this
+    block. Sync-completion branches call st.rerun() for a full app refresh.
+    """
+    st.title("Data Sync")
+
+    sync_status = get_cached_sync_status()
+
+    if sync_status["has_data"]:
+        st.success(f"Data loaded: {sync_status['min_year']}-{sync_status['max_year']}")
+        if sync_status["last_full_sync"]:
+            st.caption(f"Last full sync: {sync_status['last_full_sync'][:16]}")
+        if sync_status["last_incremental_sync"]:
+            st.caption(f"Last quick sync: {sync_status['last_incremental_sync'][:16]}")
+        if sync_status["last_enriched_sync"]:
+            st.caption(f"Last enriched sync: {sync_status['last_enriched_sync'][:16]}")
+    else:
+        st.warning("No data yet. Run a full sync to get started.")
+
+    st.divider()
+
+    # Quick sync (current year only)
+    if st.button("Quick Sync (current year)", type="primary", use_container_width=True):
+        try:
+            from src.toggl_client import TogglClient
+            from src.sync import sync_current_year
+
+            client = TogglClient()
+            # Projects and tags may have changed in Toggl since the last sync
+            client.invalidate_cache()
+            progress_bar = st.progress(0)
+            status_text = st.empty()
+
+            def on_progress(msg, frac):
+                status_text.text(msg)
+                progress_bar.progress(min(frac, 1.0))
+
+            result = sync_current_year(client, progress_callback=on_progress)
+            st.success(f"Synced {result['entries']} entries for {result['year']}")
+            time.sleep(1.5)
+            st.cache_data.clear()
+            st.rerun()
+        except Exception as e:
+            st.error(f"Sync failed: {e}")
+
+    # Full sync
+    with st.expander("Full Sync (all years)"):
+        earliest = st.number_input("Earliest year", min_value=2006, max_value=date.today().year, value=2017)
+        if st.button("Run Full Sync", use_container_width=True):
+            try:
+                from src.toggl_client import TogglClient
+                from src.sync import sync_all
+
+                client = TogglClient()
+                client.invalidate_cache()
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+
+                def on_full_progress(msg, frac):
+                    status_text.text(msg)
+                    progress_bar.progress(min(frac, 1.0))
+
+                result = sync_all(client, earliest_year=int(earliest), progress_callback=on_full_progress)
+                st.success(
+                    f"Synced {result['total_entries']} entries across {result['years_synced']} years "
+                    f"({result['projects']} projects, {result['tags']} tags)"
+                )
+                time.sleep(1.5)
+                st.cache_data.clear()
+                st.rerun()
+            except Exception as e:
+                st.error(f"Sync failed: {e}")
+
+    # Enriched sync — pulls full JSON data while on Premium
+    with st.expander("Enriched Sync (Premium)", expanded=False):
+        st.caption(
+            "Pulls native Toggl IDs, project_id, tag_ids, task data, client names, "
+            "and Premium project fields via the JSON API. "
+            "Requires ~2 hrs on Premium (600 req/hr). "
+            "Enriched data persists after Premium expires."
+        )
+
+        # Show current enrichment coverage if data exists
+        if sync_status["has_data"]:
+            try:
+                _stats = get_enrichment_stats(get_reader_conn())
+                _pct = (
+                    int(100 * _stats["enriched_entries"] / _stats["total_entries"])
+                    if _stats["total_entries"] > 0 else 0
+                )
+                st.metric(
+                    "Enrichment Coverage",
+                    f"{_stats['enriched_entries']:,} / {_stats['total_entries']:,} ({_pct}%)",
+                )
+                if sync_status["last_enriched_sync"]:
+                    st.caption(f"Last enriched: {sync_status['last_enriched_sync'][:16]}")
+                if _stats["total_tasks"] > 0 or _stats["total_clients"] > 0:
+                    st.caption(f"{_stats['total_tasks']} tasks · {_stats['total_clients']} clients stored")
+            except Exception:
+                pass
+
+        st.caption(
+            "Note: Streamlit Cloud has an ephemeral filesystem. "
+            "Enriched data is lost on cold start and must be re-synced manually."
+        )
+
+        earliest_e = st.number_input(
+            "Earliest year", min_value=2006, max_value=date.today().year, value=2017,
+            key="enriched_earliest",
+        )
+        if st.button("Run Enriched Sync", use_container_width=True, type="secondary"):
+            try:
+                from src.toggl_client import TogglClient
+                from src.sync import sync_enriched_all
+
+                client = TogglClient()
+                client.invalidate_cache()
+                progress_bar = st.progress(0)
+                status_text = st.empty()
+
+                def on_enrich_progress(msg, frac):
+                    status_text.text(msg)
+                    progress_bar.progress(min(frac, 1.0))
+
+                result = sync_enriched_all(
+                    client,
+                    earliest_year=int(earliest_e),
+                    progress_callback=on_enrich_progress,
+                )
+                st.success(
+                    f"Enriched {result['total_entries']:,} entries across {result['years_enriched']} years "
+                    f"({result['tasks']} tasks, {result['clients']} clients)"
+                )
+                if result["errors"]:
+                    st.warning(f"{len(result['errors'])} year(s) failed: {', '.join(result['errors'])}")
+                time.sleep(1.5)
+                st.cache_data.clear()
+                st.rerun()
+            except Exception as e:
+                st.error(f"Enriched sync failed: {e}")
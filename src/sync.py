@@ -8,20 +8,70 @@ Handles:
 - Progress callbacks for UI display
 """
 
+from __future__ import annotations
+
 import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date, datetime
 from pathlib import Path
-from typing import Callable
+from typing import TYPE_CHECKING, Callable
+
+import streamlit as st
+
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
 
-from src.toggl_client import TogglClient
+if TYPE_CHECKING:
+    # Only needed for annotations; the HTTP client stack loads when a sync runs
+    from src.toggl_client import TogglClient
 from src.data_store import (
-    get_connection, upsert_time_entries, upsert_projects, upsert_tags,
+    writer_connection, get_reader_conn, upsert_time_entries, upsert_projects, upsert_tags,
     upsert_clients, upsert_tasks,
-    set_sync_meta, get_sync_meta, get_available_years,
+    set_sync_meta, get_sync_meta, get_year_bounds, commit_writes,
 )
 
 DATA_RAW_DIR = Path(__file__).parent.parent / "data" / "raw"
 
+# Concurrent year downloads during a full sync
+FETCH_WORKERS = 4
+
+
+def _record_year_bounds(conn: sqlite3.Connection, commit: bool = True) -> tuple[int, int] | None:
+    """Store the min/max entry year in sync_meta so status checks skip a table scan."""
+    bounds = get_year_bounds(conn)
+    if bounds:
+        set_sync_meta(conn, "min_year", str(bounds[0]), commit=False)
+        set_sync_meta(conn, "max_year", str(bounds[1]), commit=False)
+    if commit:
+        commit_writes(conn)
+    return bounds
+
+
+def _fill_project_names(entries: list[dict], project_map: dict[int, str]) -> None:
+    """Fill a missing project_name in place from the id -> name lookup."""
+    get = project_map.get
+    for e in entries:
+        pid = e.get("project_id")
+        if pid and not e.get("project_name"):
+            e["project_name"] = get(pid, "")
+
+
+def _write_archive(path: Path, entries: list[dict], pretty: bool = False) -> None:
+    """
+    Save a year's raw entries as JSON (compact unless pretty is set).
+    Uses orjson when installed, otherwise the stdlib encoder.
+    """
+    if _HAS_ORJSON:
+        path.write_bytes(orjson.dumps(entries, option=orjson.OPT_INDENT_2 if pretty else 0))
+        return
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(entries, f, indent=2 if pretty else None, ensure_ascii=False,
+                  separators=None if pretty else (",", ":"))
+
 
 def sync_all(
     client: TogglClient,
@@ -33,11 +83,15 @@ def sync_all(
     Saves raw JSON per year and populates SQLite.
     1 API call per year — very efficient on the Free tier (30 req/hr).
 
+    Each write is a short transaction taken after the data it stores has been
+    fetched, so SQLite's write lock is never held across the network. Every
+    year commits as soon as it is downloaded, so an interrupted run keeps
+    the years it finished.
+
     progress_callback(message, fraction) is called to report progress.
     Returns a summary dict.
     """
     DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
-    conn = get_connection()
     current_year = date.today().year
     years = list(range(earliest_year, current_year + 1))
     total_entries = 0
@@ -50,51 +104,59 @@ def sync_all(
     # Step 1: Fetch projects and tags (2 API calls)
     report("Fetching projects...", 0.0)
     projects = client.get_projects()
-    upsert_projects(conn, projects)
-    report(f"  Stored {len(projects)} projects", 0.02)
+    report(f"  Fetched {len(projects)} projects", 0.02)
 
     report("Fetching tags...", 0.04)
     tags = client.get_tags()
-    upsert_tags(conn, tags)
-    report(f"  Stored {len(tags)} tags", 0.06)
+    report(f"  Fetched {len(tags)} tags", 0.06)
+
+    # Metadata lands in its own short transaction, before any entry download
+    with writer_connection() as conn:
+        upsert_projects(conn, projects, commit=False)
+        upsert_tags(conn, tags, commit=False)
+        commit_writes(conn)
 
     # Build project name lookup for enriching entries if project_name is missing
     project_map = {p["id"]: p.get("name", "") for p in projects}
 
-    # Step 2: Fetch time entries year by year (CSV export = 1 API call per year)
+    # Step 2: Fetch time entries (CSV export = 1 API call per year). Downloads
+    # overlap on a small pool (the client's rate limiter still spaces the
+    # requests); archiving and the per-year upserts stay on this thread.
     errors: list[str] = []
-    for i, year in enumerate(years):
-        frac = 0.06 + (0.90 * (i / len(years)))
-        report(f"Fetching {year}...", frac)
-
-        try:
-            entries = client.fetch_year_entries(year)
-        except Exception as exc:
-            msg = f"  {year}: FAILED ({exc})"
-            report(msg, frac + 0.04)
-            errors.append(msg)
-            continue
-
-        # Enrich entries with project names if missing
-        for e in entries:
-            if not e.get("project_name") and e.get("project_id"):
-                e["project_name"] = project_map.get(e["project_id"], "")
-
-        # Save raw JSON for archival
-        raw_path = DATA_RAW_DIR / f"{year}.json"
-        with open(raw_path, "w", encoding="utf-8") as f:
-            json.dump(entries, f, indent=2, ensure_ascii=False)
-
-        upsert_time_entries(conn, entries)
-        total_entries += len(entries)
-        report(f"  {year}: {len(entries)} entries", frac + 0.04)
+    report(f"Fetching {years[0]}-{years[-1]}...", 0.06)
+    with ThreadPoolExecutor(max_workers=FETCH_WORKERS) as pool:
+        futures = {pool.submit(client.fetch_year_entries, year): year for year in years}
+        for i, future in enumerate(as_completed(futures)):
+            year = futures[future]
+            frac = 0.06 + (0.90 * (i / len(years)))
+            try:
+                entries = future.result()
+            except Exception as exc:
+                msg = f"  {year}: FAILED ({exc})"
+                report(msg, frac + 0.04)
+                errors.append(msg)
+                continue
+
+            # Enrich entries with project names if missing
+            _fill_project_names(entries, project_map)
+
+            # Save raw JSON for archival
+            raw_path = DATA_RAW_DIR / f"{year}.json"
+            _write_archive(raw_path, entries)
+
+            with writer_connection() as conn:
+                upsert_time_entries(conn, entries)
+            total_entries += len(entries)
+            report(f"  {year}: {len(entries)} entries", frac + 0.04)
+
+    # Step 3: Record sync timestamp (all sync_meta writes share one commit)
+    with writer_connection() as conn:
+        now = datetime.now(tz=None).isoformat()
+        set_sync_meta(conn, "last_full_sync", now, commit=False)
+        set_sync_meta(conn, "earliest_year", str(earliest_year), commit=False)
+        _record_year_bounds(conn, commit=False)
+        commit_writes(conn)
 
-    # Step 3: Record sync timestamp
-    now = datetime.now(tz=None).isoformat()
-    set_sync_meta(conn, "last_full_sync", now)
-    set_sync_meta(conn, "earliest_year", str(earliest_year))
-
-    conn.close()
     report("Sync complete!", 1.0)
 
     return {
@@ -115,7 +177,6 @@ def sync_current_year(
     Much faster and uses fewer API calls than a full sync (3 total API calls).
     """
     DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
-    conn = get_connection()
     year = date.today().year
 
     def report(msg: str, frac: float):
@@ -125,30 +186,30 @@ def sync_current_year(
 
     report("Refreshing projects & tags...", 0.0)
     projects = client.get_projects()
-    upsert_projects(conn, projects)
     tags = client.get_tags()
-    upsert_tags(conn, tags)
 
     project_map = {p["id"]: p.get("name", "") for p in projects}
 
     report(f"Fetching {year} entries...", 0.3)
     entries = client.fetch_year_entries(year)
 
-    for e in entries:
-        if not e.get("project_name") and e.get("project_id"):
-            e["project_name"] = project_map.get(e["project_id"], "")
+    _fill_project_names(entries, project_map)
 
     raw_path = DATA_RAW_DIR / f"{year}.json"
-    with open(raw_path, "w", encoding="utf-8") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
+    _write_archive(raw_path, entries)
 
-    upsert_time_entries(conn, entries)
+    # All API calls are done; write everything in one transaction
+    with writer_connection() as conn:
+        upsert_projects(conn, projects, commit=False)
+        upsert_tags(conn, tags, commit=False)
+        upsert_time_entries(conn, entries, commit=False)
 
-    now = datetime.now(tz=None).isoformat()
-    set_sync_meta(conn, "last_incremental_sync", now)
-    set_sync_meta(conn, f"last_sync_{year}", now)
+        now = datetime.now(tz=None).isoformat()
+        set_sync_meta(conn, "last_incremental_sync", now, commit=False)
+        set_sync_meta(conn, f"last_sync_{year}", now, commit=False)
+        _record_year_bounds(conn, commit=False)
+        commit_writes(conn)
 
-    conn.close()
     report("Sync complete!", 1.0)
 
     return {
@@ -178,14 +239,16 @@ def sync_enriched_all(
 
     IMPORTANT: This function makes many more API calls than sync_all().
     With Premium (600 req/hr) a full 10-year backfill takes approximately 2 hours.
-    The function is designed to be idempotent — upserts are safe to re-run if
-    interrupted (each completed year persists to SQLite before moving on).
+    The metadata and then each year are written in short transactions taken
+    after their fetches, so SQLite's write lock is never held across the
+    rate-limited calls. The function is designed to be idempotent — upserts
+    are safe to re-run if interrupted (each completed year persists to SQLite
+    before moving on).
 
     progress_callback(message, fraction) is called to report progress.
     Returns a summary dict with enrichment coverage statistics.
     """
     DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
-    conn = get_connection()
     wid = client.get_workspace_id()
     current_year = date.today().year
     years = list(range(earliest_year, current_year + 1))
@@ -208,30 +271,34 @@ def sync_enriched_all(
     # ---- Step 1: Clients (1 API call) ----------------------------------------
     report("Fetching clients...", 0.00)
     clients = client.get_clients(wid)
-    upsert_clients(conn, clients)
     client_map: dict[int, str] = {c["id"]: c.get("name", "") for c in clients}
-    report(f"  Stored {len(clients)} clients", 0.03)
+    report(f"  Fetched {len(clients)} clients", 0.03)
 
     # ---- Step 2: Projects — with Premium fields (1 API call) -----------------
     report("Fetching projects (with Premium fields)...", 0.03)
     projects = client.get_projects(wid)
-    upsert_projects(conn, projects)
     project_map: dict[int, str] = {p["id"]: p.get("name", "") for p in projects}
-    report(f"  Stored {len(projects)} projects", 0.06)
+    report(f"  Fetched {len(projects)} projects", 0.06)
 
     # ---- Step 3: Tags — with enriched metadata (1 API call) ------------------
     report("Fetching tags (with enriched metadata)...", 0.06)
     tags = client.get_tags(wid)
-    upsert_tags(conn, tags)
-    tag_map: dict[int, str] = {t["id"]: t.get("name", "") for t in tags}
-    report(f"  Stored {len(tags)} tags", 0.09)
+    tag_map = client.tag_map(wid)
+    report(f"  Fetched {len(tags)} tags", 0.09)
 
     # ---- Step 4: Tasks per project — Premium (1 call per active project) ------
     report("Fetching tasks (Premium)...", 0.09)
     all_tasks = client.get_all_tasks(projects, workspace_id=wid)
-    upsert_tasks(conn, all_tasks)
     task_map: dict[int, str] = {t["id"]: t.get("name", "") for t in all_tasks}
-    report(f"  Stored {len(all_tasks)} tasks across {len(projects)} projects", 0.15)
+    report(f"  Fetched {len(all_tasks)} tasks across {len(projects)} projects", 0.15)
+
+    # All metadata is in hand; store it in one short transaction
+    with writer_connection() as conn:
+        upsert_clients(conn, clients, commit=False)
+        upsert_projects(conn, projects, commit=False)
+        upsert_tags(conn, tags, commit=False)
+        upsert_tasks(conn, all_tasks, commit=False)
+        commit_writes(conn)
 
     # ---- Step 5: Time entries year by year via JSON ---------------------------
     entry_frac_start = 0.15
@@ -257,27 +324,28 @@ def sync_enriched_all(
 
         # Backfill project_name if missing (shouldn't be needed with enrich_response
         # but defensive in case the API omits it on older entries)
-        for e in entries:
-            if not e.get("project_name") and e.get("project_id"):
-                e["project_name"] = project_map.get(e["project_id"], "")
+        _fill_project_names(entries, project_map)
 
         # Save enriched JSON archive alongside the CSV-derived archive
         raw_path = DATA_RAW_DIR / f"{year}_enriched.json"
-        with open(raw_path, "w", encoding="utf-8") as f:
-            json.dump(entries, f, indent=2, ensure_ascii=False)
+        _write_archive(raw_path, entries)
 
-        upsert_time_entries(conn, entries)
+        # Commit this year before the next fetch, so an interrupted run keeps it
+        with writer_connection() as conn:
+            upsert_time_entries(conn, entries)
         total_entries += len(entries)
 
         done_frac = entry_frac_start + (entry_frac_span * ((i + 1) / len(years)))
         report(f"  {year}: {len(entries)} entries enriched", done_frac)
 
     # ---- Step 6: Record enrichment metadata ----------------------------------
-    now = datetime.now(tz=None).isoformat()
-    set_sync_meta(conn, "last_enriched_sync", now)
-    set_sync_meta(conn, "enriched_earliest_year", str(earliest_year))
+    with writer_connection() as conn:
+        now = datetime.now(tz=None).isoformat()
+        set_sync_meta(conn, "last_enriched_sync", now, commit=False)
+        set_sync_meta(conn, "enriched_earliest_year", str(earliest_year), commit=False)
+        _record_year_bounds(conn, commit=False)
+        commit_writes(conn)
 
-    conn.close()
     report("Enrichment sync complete!", 1.0)
 
     return {
@@ -300,7 +368,6 @@ def sync_enriched_current_year(
     Useful for keeping enriched data current without a full multi-hour re-run.
     """
     DATA_RAW_DIR.mkdir(parents=True, exist_ok=True)
-    conn = get_connection()
     wid = client.get_workspace_id()
     year = date.today().year
 
@@ -311,19 +378,15 @@ def sync_enriched_current_year(
 
     report("Fetching metadata...", 0.0)
     clients = client.get_clients(wid)
-    upsert_clients(conn, clients)
     client_map = {c["id"]: c.get("name", "") for c in clients}
 
     projects = client.get_projects(wid)
-    upsert_projects(conn, projects)
     project_map = {p["id"]: p.get("name", "") for p in projects}
 
     tags = client.get_tags(wid)
-    upsert_tags(conn, tags)
-    tag_map = {t["id"]: t.get("name", "") for t in tags}
+    tag_map = client.tag_map(wid)
 
     all_tasks = client.get_all_tasks(projects, workspace_id=wid)
-    upsert_tasks(conn, all_tasks)
     task_map = {t["id"]: t.get("name", "") for t in all_tasks}
 
     report(f"Enriching {year} entries (JSON)...", 0.3)
@@ -335,20 +398,24 @@ def sync_enriched_current_year(
         workspace_id=wid,
     )
 
-    for e in entries:
-        if not e.get("project_name") and e.get("project_id"):
-            e["project_name"] = project_map.get(e["project_id"], "")
+    _fill_project_names(entries, project_map)
 
     raw_path = DATA_RAW_DIR / f"{year}_enriched.json"
-    with open(raw_path, "w", encoding="utf-8") as f:
-        json.dump(entries, f, indent=2, ensure_ascii=False)
+    _write_archive(raw_path, entries)
 
-    upsert_time_entries(conn, entries)
+    # All API calls are done; write everything in one transaction
+    with writer_connection() as conn:
+        upsert_clients(conn, clients, commit=False)
+        upsert_projects(conn, projects, commit=False)
+        upsert_tags(conn, tags, commit=False)
+        upsert_tasks(conn, all_tasks, commit=False)
+        upsert_time_entries(conn, entries, commit=False)
 
-    now = datetime.now(tz=None).isoformat()
-    set_sync_meta(conn, "last_enriched_sync", now)
+        now = datetime.now(tz=None).isoformat()
+        set_sync_meta(conn, "last_enriched_sync", now, commit=False)
+        _record_year_bounds(conn, commit=False)
+        commit_writes(conn)
 
-    conn.close()
     report("Enrichment sync complete!", 1.0)
 
     return {
@@ -361,18 +428,34 @@ def sync_enriched_current_year(
 
 def get_sync_status() -> dict:
     """Return information about when the last sync happened."""
-    conn = get_connection()
+    conn = get_reader_conn()
     last_full = get_sync_meta(conn, "last_full_sync")
     last_incr = get_sync_meta(conn, "last_incremental_sync")
     last_enriched = get_sync_meta(conn, "last_enriched_sync")
     earliest = get_sync_meta(conn, "earliest_year")
-    years = get_available_years(conn)
-    conn.close()
+    min_year = get_sync_meta(conn, "min_year")
+    max_year = get_sync_meta(conn, "max_year")
+    if min_year is None:
+        # Databases synced before the bounds were recorded: compute them
+        # read-only (never wait on the writer lock a running sync holds)
+        bounds = get_year_bounds(conn)
+        if bounds:
+            min_year, max_year = bounds
     return {
         "last_full_sync": last_full,
         "last_incremental_sync": last_incr,
         "last_enriched_sync": last_enriched,
         "earliest_year": int(earliest) if earliest else None,
-        "years_with_data": years,
-        "has_data": len(years) > 0,
+        "min_year": int(min_year) if min_year is not None else None,
+        "max_year": int(max_year) if max_year is not None else None,
+        "has_data": min_year is not None,
     }
+
+
+@st.cache_data(ttl=30, show_spinner=False)
+def get_cached_sync_status() -> dict:
+    """
+    get_sync_status() memoized across Streamlit reruns.
+    UI code clears it with st.cache_data.clear() after a sync completes.
+    """
+    return get_sync_status()
@@ -11,14 +11,25 @@ import json
 import os
 import io
 import csv
+import codecs
 import hashlib
+import threading
+from collections import deque
+from collections.abc import Callable, Iterable
 from datetime import datetime, date
 from pathlib import Path
 from base64 import b64encode
 
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
+try:
+    import orjson
+    _HAS_ORJSON = True
+except ImportError:
+    _HAS_ORJSON = False
+
 load_dotenv()
 
 
@@ -45,6 +56,12 @@ REPORTS_V3 = f"{BASE_URL}/reports/api/v3"
 # Free: 30/hr, Starter: 240/hr, Premium: 600/hr, Enterprise: higher.
 MAX_REQUESTS_PER_HOUR_DEFAULT = 30
 SAFE_INTERVAL_SECONDS = 1.1  # slightly over 1 req/sec burst protection
+HTTP_POOL_SIZE = 4  # kept connections to the API host (one per concurrent fetch)
+
+
+def _response_json(resp: requests.Response):
+    """Decode a JSON response body, with orjson when it is installed."""
+    return orjson.loads(resp.content) if _HAS_ORJSON else resp.json()
 
 
 class RateLimiter:
@@ -56,6 +73,8 @@ class RateLimiter:
     the remaining count and infer the window ceiling, then keep it updated.
     This means Premium users (600/hr) automatically get the higher budget without
     any manual configuration.
+
+    Safe to share across threads: request slots are handed out one at a time.
     """
 
     def __init__(
@@ -65,15 +84,25 @@ class RateLimiter:
     ):
         self.max_per_hour = max_per_hour
         self.min_interval = min_interval
-        self._timestamps: list[float] = []
-        self._last_request: float = 0
+        # time.monotonic() stamps of requests in the last hour, oldest first
+        self._timestamps: deque[float] = deque()
+        self._last_request: float = float("-inf")
         # Tracks whether we've upgraded the quota ceiling from headers yet.
         self._quota_detected: bool = False
+        self._lock = threading.Lock()
+
+    def _prune(self, now: float) -> float:
+        """Drop timestamps older than 1 hour (caller holds the lock); returns the cutoff."""
+        one_hour_ago = now - 3600
+        stamps = self._timestamps
+        while stamps and stamps[0] <= one_hour_ago:
+            stamps.popleft()
+        return one_hour_ago
 
     def clear_stale(self):
         """Remove timestamps older than 1 hour. Call at the start of each year's fetch."""
-        one_hour_ago = time.time() - 3600
-        self._timestamps = [t for t in self._timestamps if t > one_hour_ago]
+        with self._lock:
+            self._prune(time.monotonic())
 
     def update_from_headers(self, headers: dict):
         """
@@ -96,42 +125,155 @@ class RateLimiter:
         except (ValueError, TypeError):
             return
 
-        # Estimate ceiling = consumed so far + remaining
-        one_hour_ago = time.time() - 3600
-        consumed = len([t for t in self._timestamps if t > one_hour_ago])
-        inferred_ceiling = consumed + remaining
-
-        # Only ever upgrade the ceiling, never downgrade (avoids jitter from
-        # late-in-window observations where consumed+remaining < real ceiling).
-        if inferred_ceiling > self.max_per_hour:
-            if not self._quota_detected:
-                print(
-                    f"[rate-limit] Detected quota ceiling: {inferred_ceiling} req/hr "
-                    f"(was {self.max_per_hour}). Upgrading."
-                )
-            self.max_per_hour = inferred_ceiling
-            self._quota_detected = True
+        with self._lock:
+            # Estimate ceiling = consumed so far + remaining
+            self._prune(time.monotonic())
+            consumed = len(self._timestamps)
+            inferred_ceiling = consumed + remaining
+
+            # Only ever upgrade the ceiling, never downgrade (avoids jitter from
+            # late-in-window observations where consumed+remaining < real ceiling).
+            if inferred_ceiling > self.max_per_hour:
+                if not self._quota_detected:
+                    print(
+                        f"[rate-limit] Detected quota ceiling: {inferred_ceiling} req/hr "
+                        f"(was {self.max_per_hour}). Upgrading."
+                    )
+                self.max_per_hour = inferred_ceiling
+                self._quota_detected = True
 
     def wait_if_needed(self):
-        """Block until it's safe to make the next request."""
-        now = time.time()
+        """
+        Block until it's safe to make the next request. The lock is held while
+        sleeping so concurrent callers are spaced out one after another.
+        """
+        with self._lock:
+            # Monotonic clock: wall-clock (NTP) adjustments can't skew the windows
+            now = time.monotonic()
+
+            # Enforce minimum interval between requests (burst protection)
+            elapsed = now - self._last_request
+            if elapsed < self.min_interval:
+                time.sleep(self.min_interval - elapsed)
+                now = time.monotonic()
 
-        # Enforce minimum interval between requests (burst protection)
-        elapsed = now - self._last_request
-        if elapsed < self.min_interval:
-            time.sleep(self.min_interval - elapsed)
+            # Enforce hourly quota — drop timestamps outside the rolling window
+            one_hour_ago = self._prune(now)
 
-        # Enforce hourly quota — drop timestamps outside the rolling window
-        one_hour_ago = time.time() - 3600
-        self._timestamps = [t for t in self._timestamps if t > one_hour_ago]
+            if len(self._timestamps) >= self.max_per_hour:
+                wait_time = self._timestamps[0] - one_hour_ago + 1
+                print(f"[rate-limit] Hourly quota ({self.max_per_hour}/hr) reached. Waiting {wait_time:.0f}s...")
+                time.sleep(wait_time)
 
-        if len(self._timestamps) >= self.max_per_hour:
-            wait_time = self._timestamps[0] - one_hour_ago + 1
-            print(f"[rate-limit] Hourly quota ({self.max_per_hour}/hr) reached. Waiting {wait_time:.0f}s...")
-            time.sleep(wait_time)
+            self._last_request = time.monotonic()
+            self._timestamps.append(self._last_request)
 
-        self._last_request = time.time()
-        self._timestamps.append(self._last_request)
+
+def _csv_duration_seconds(dur_str: str) -> int:
+    """Parse duration from "HH:MM:SS" to seconds (0 when malformed)."""
+    try:
+        parts = dur_str.split(":")
+        return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+    except (ValueError, IndexError):
+        return 0
+
+
+def _csv_tag_list(tags_str: str) -> list[str]:
+    """Split the CSV's comma-joined Tags cell into trimmed, non-empty names."""
+    return [t.strip() for t in tags_str.split(",") if t.strip()] if tags_str else []
+
+
+def _parse_csv_entries(lines: Iterable[str]) -> list[dict]:
+    """
+    Turn a Reports API CSV export (any text line iterable, e.g. a file
+    opened with newline="") into flat dicts for upsert_time_entries.
+    Rows are read as plain lists by column position (no per-row dict from
+    DictReader), and durations and tag lists are parsed once per distinct
+    cell value. The synthetic id stays sha256 of
+    start|stop|description|project|duration so re-synced rows keep their
+    primary keys.
+    """
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return []
+    # Last occurrence wins for a repeated header, as with DictReader
+    pos = {name: i for i, name in enumerate(header)}
+
+    def getter(name: str, default: str):
+        # Short rows yield None for missing cells, as DictReader would
+        i = pos.get(name)
+        if i is None:
+            return lambda row: default
+        return lambda row: row[i] if i < len(row) else None
+
+    get_duration = getter("Duration", "0:00:00")
+    get_start_date = getter("Start date", "")
+    get_start_time = getter("Start time", "00:00:00")
+    get_end_date = getter("End date", "")
+    get_end_time = getter("End time", "00:00:00")
+    get_tags = getter("Tags", "")
+    get_description = getter("Description", "")
+    get_project = getter("Project", "")
+    get_billable = getter("Billable", "No")
+
+    durations: dict[str, int] = {}
+    tag_lists: dict[str, list[str]] = {}
+    entries = []
+    for row in reader:
+        if not row:
+            continue  # DictReader skips blank lines too
+
+        dur_str = get_duration(row)
+        duration_sec = durations.get(dur_str)
+        if duration_sec is None:
+            duration_sec = durations[dur_str] = _csv_duration_seconds(dur_str)
+
+        start_date_str = get_start_date(row)
+        start_iso = f"{start_date_str}T{get_start_time(row)}" if start_date_str else ""
+
+        end_date_str = get_end_date(row)
+        stop_iso = f"{end_date_str}T{get_end_time(row)}" if end_date_str else ""
+
+        tags_str = get_tags(row)
+        tags = tag_lists.get(tags_str)
+        if tags is None:
+            tags = tag_lists[tags_str] = _csv_tag_list(tags_str)
+
+        description = get_description(row)
+        project = get_project(row)
+        id_seed = f"{start_iso}|{stop_iso}|{description}|{project}|{duration_sec}"
+        synth_id = int(hashlib.sha256(id_seed.encode()).hexdigest()[:15], 16)
+
+        entries.append({
+            "id": synth_id,
+            "toggl_id": None,  # CSV path — native ID unknown
+            "description": description,
+            "start": start_iso,
+            "stop": stop_iso,
+            "duration": duration_sec,
+            "project_id": None,
+            "project_name": project,
+            "workspace_id": None,
+            "tags": list(tags),
+            "tag_ids": [],
+            "billable": get_billable(row) == "Yes",
+            "at": "",
+            "task_id": None,
+            "task_name": "",
+            "client_name": "",
+            "user_id": None,
+        })
+    return entries
+
+
+# Workspace metadata (profile, projects, tags) is shared by every client for
+# METADATA_TTL_SECONDS, so repeated lookups within one run (the enrichment
+# syncs, the Supabase script) cost one request each. The app's sync entry
+# points call invalidate_cache() first, so edits made in Toggl always land.
+METADATA_TTL_SECONDS = 600
+_metadata_cache: dict[tuple, tuple[float, object]] = {}
+_metadata_lock = threading.Lock()
 
 
 class TogglClient:
@@ -145,8 +287,17 @@ class TogglClient:
                 "Copy .env.example to .env and paste your token from https://track.toggl.com/profile"
             )
         self._session = requests.Session()
-        self._session.auth = (self.api_token, "api_token")
-        self._session.headers.update({"Content-Type": "application/json"})
+        # Every endpoint lives on one host: keep a single pool, sized for the
+        # concurrent year downloads in sync_all
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=HTTP_POOL_SIZE)
+        self._session.mount("https://", adapter)
+        # The token never changes, so encode the Basic auth header once here
+        # rather than letting requests rebuild it on every call
+        token_b64 = b64encode(f"{self.api_token}:api_token".encode()).decode()
+        self._session.headers.update({
+            "Authorization": f"Basic {token_b64}",
+            "Content-Type": "application/json",
+        })
         self._limiter = RateLimiter()
 
         # Cached after first call
@@ -162,6 +313,9 @@ class TogglClient:
         Make a rate-limited HTTP request with retry on 429/402.
         Updates the rate limiter's quota ceiling from response headers on each call.
         """
+        if _HAS_ORJSON and kwargs.get("json") is not None:
+            # Encode the body once with orjson (the session sets Content-Type)
+            kwargs["data"] = orjson.dumps(kwargs.pop("json"))
         for attempt in range(retries):
             self._limiter.wait_if_needed()
             resp = self._session.request(method, url, **kwargs)
@@ -200,11 +354,34 @@ class TogglClient:
     # User & Workspace
     # ------------------------------------------------------------------
 
+    def _cached(self, key: tuple, fetch: Callable[[], object]) -> object:
+        """
+        Return fetch() through the shared metadata cache, keyed on this token
+        plus key. A None result (failed request) is not cached.
+        """
+        key = (self.api_token, *key)
+        with _metadata_lock:
+            hit = _metadata_cache.get(key)
+        if hit is not None and time.monotonic() - hit[0] < METADATA_TTL_SECONDS:
+            return hit[1]
+        value = fetch()
+        if value is not None:
+            with _metadata_lock:
+                _metadata_cache[key] = (time.monotonic(), value)
+        return value
+
+    def invalidate_cache(self) -> None:
+        """Forget the cached profile, workspace and metadata for this token."""
+        self._me = None
+        self._workspace_id = None
+        with _metadata_lock:
+            for key in [k for k in _metadata_cache if k[0] == self.api_token]:
+                del _metadata_cache[key]
+
     def get_me(self) -> dict:
-        """Fetch the authenticated user profile. Cached after first call."""
+        """Fetch the authenticated user profile. Cached (see METADATA_TTL_SECONDS)."""
         if self._me is None:
-            resp = self._get(f"{API_V9}/me")
-            self._me = resp.json()
+            self._me = self._cached(("me",), lambda: _response_json(self._get(f"{API_V9}/me")))
         assert self._me is not None
         return self._me
 
@@ -222,29 +399,53 @@ class TogglClient:
 
     def get_projects(self, workspace_id: int | None = None) -> list[dict]:
         """
-        Fetch all projects for the workspace.
+        Fetch all projects for the workspace (cached, see METADATA_TTL_SECONDS).
         With Premium, the response includes billable, rate, currency, fixed_fee,
         estimated_hours, estimated_seconds, auto_estimates, recurring, and template fields.
         """
         wid = workspace_id or self.get_workspace_id()
-        resp = self._get(f"{API_V9}/workspaces/{wid}/projects", params={"per_page": 200})
-        return resp.json() if resp.status_code == 200 else []
+
+        def fetch():
+            resp = self._get(f"{API_V9}/workspaces/{wid}/projects", params={"per_page": 200})
+            return _response_json(resp) if resp.status_code == 200 else None
+
+        data = self._cached(("projects", wid), fetch)
+        return list(data) if data is not None else []
 
     def get_tags(self, workspace_id: int | None = None) -> list[dict]:
         """
-        Fetch all tags for the workspace.
+        Fetch all tags for the workspace (cached, see METADATA_TTL_SECONDS).
         Returns richer metadata than before: creator_id, at, deleted_at.
         """
         wid = workspace_id or self.get_workspace_id()
-        resp = self._get(f"{API_V9}/workspaces/{wid}/tags")
-        return resp.json() if resp.status_code == 200 else []
+
+        def fetch():
+            resp = self._get(f"{API_V9}/workspaces/{wid}/tags")
+            return _response_json(resp) if resp.status_code == 200 else None
+
+        data = self._cached(("tags", wid), fetch)
+        return list(data) if data is not None else []
+
+    def tag_map(self, workspace_id: int | None = None) -> dict[int, str]:
+        """
+        {tag_id: tag_name} for the workspace, built once from get_tags() and
+        cached alongside it. Don't mutate the returned dict.
+        """
+        wid = workspace_id or self.get_workspace_id()
+
+        def build():
+            tags = self.get_tags(wid)
+            # An empty list may be a failed request, so leave it uncached
+            return {t["id"]: t.get("name", "") for t in tags} if tags else None
+
+        return self._cached(("tag_map", wid), build) or {}
 
     def get_clients(self, workspace_id: int | None = None) -> list[dict]:
         """Fetch all clients for the workspace."""
         wid = workspace_id or self.get_workspace_id()
         resp = self._get(f"{API_V9}/workspaces/{wid}/clients")
         if resp.status_code == 200:
-            data = resp.json()
+            data = _response_json(resp)
             # API returns null when there are no clients
             return data if isinstance(data, list) else []
         return []
@@ -261,7 +462,7 @@ class TogglClient:
                 params={"per_page": 200},
             )
             if resp.status_code == 200:
-                data = resp.json()
+                data = _response_json(resp)
                 return data if isinstance(data, list) else []
         except requests.HTTPError as exc:
             if exc.response is not None and exc.response.status_code in (403, 404):
@@ -302,7 +503,7 @@ class TogglClient:
             f"{API_V9}/me/time_entries",
             params={"start_date": start_date, "end_date": end_date},
         )
-        return resp.json()
+        return _response_json(resp)
 
     # ------------------------------------------------------------------
     # Reports API v3 — Detailed Report (workspace-specific, org quota)
@@ -334,7 +535,7 @@ class TogglClient:
             body["first_row_number"] = first_row_number
 
         resp = self._post(f"{REPORTS_V3}/workspace/{wid}/search/time_entries", json=body)
-        data = resp.json()
+        data = _response_json(resp)
         # API returns null on empty result sets
         return (data if isinstance(data, list) else []), dict(resp.headers)
 
@@ -402,7 +603,7 @@ class TogglClient:
             "sub_grouping": sub_grouping,
         }
         resp = self._post(f"{REPORTS_V3}/workspace/{wid}/summary/time_entries", json=body)
-        return resp.json()
+        return _response_json(resp)
 
     # ------------------------------------------------------------------
     # Flatten helpers
@@ -445,12 +646,18 @@ class TogglClient:
         task_map = task_map or {}
         client_map = client_map or {}
 
+        # Tag-id combinations repeat across rows; resolve each one once
+        tag_names_by_ids: dict[tuple[int, ...], list[str]] = {}
+
         for row in report_rows:
             # --- Row-level fields (shared across all sub-entries in this row) ---
             tag_ids: list[int] = row.get("tag_ids") or []
-            tag_names: list[str] = [
-                tag_map.get(tid, str(tid)) for tid in tag_ids
-            ]
+            tag_key = tuple(tag_ids)
+            tag_names = tag_names_by_ids.get(tag_key)
+            if tag_names is None:
+                tag_names = tag_names_by_ids[tag_key] = [
+                    tag_map.get(tid, str(tid)) for tid in tag_ids
+                ]
 
             task_id: int | None = row.get("task_id")
             task_name: str = ""
@@ -470,8 +677,8 @@ class TogglClient:
             billable: bool = bool(row.get("billable", False))
 
             # --- Expand each nested time entry sub-record ---
-            for te in row.get("time_entries", []):
-                flat.append({
+            flat.extend([
+                {
                     # Native Toggl entry ID — the core improvement over CSV
                     "toggl_id": te.get("id"),
                     # Keep a synthetic id field for backward compat; callers
@@ -493,7 +700,9 @@ class TogglClient:
                     "task_name": task_name,
                     "client_name": client_name,
                     "user_id": te.get("user_id"),
-                })
+                }
+                for te in row.get("time_entries") or ()
+            ])
         return flat
 
     # ------------------------------------------------------------------
@@ -515,60 +724,15 @@ class TogglClient:
         This is the fast legacy path: 1 API call per year, but drops field richness.
         """
         csv_bytes = self.fetch_year_csv(year)
-        csv_text = csv_bytes.decode("utf-8-sig")  # Toggl CSV may have BOM
 
-        if not csv_text.strip():
+        # Toggl CSV may have BOM
+        if not csv_bytes.strip(codecs.BOM_UTF8 + b" \t\r\n"):
             print(f"  {year}: empty CSV (no entries)")
             return []
 
-        reader = csv.DictReader(io.StringIO(csv_text))
-        entries = []
-        for row in reader:
-            # Parse duration from "HH:MM:SS" to seconds
-            duration_sec = 0
-            dur_str = row.get("Duration", "0:00:00")
-            try:
-                parts = dur_str.split(":")
-                duration_sec = int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
-            except (ValueError, IndexError):
-                pass
-
-            start_date_str = row.get("Start date", "")
-            start_time = row.get("Start time", "00:00:00")
-            start_iso = f"{start_date_str}T{start_time}" if start_date_str else ""
-
-            end_date_str = row.get("End date", "")
-            end_time = row.get("End time", "00:00:00")
-            stop_iso = f"{end_date_str}T{end_time}" if end_date_str else ""
-
-            tags_str = row.get("Tags", "")
-            tags = [t.strip() for t in tags_str.split(",") if t.strip()] if tags_str else []
-
-            description = row.get("Description", "")
-            project = row.get("Project", "")
-            id_seed = f"{start_iso}|{stop_iso}|{description}|{project}|{duration_sec}"
-            synth_id = int(hashlib.sha256(id_seed.encode()).hexdigest()[:15], 16)
-
-            entries.append({
-                "id": synth_id,
-                "toggl_id": None,  # CSV path — native ID unknown
-                "description": description,
-                "start": start_iso,
-                "stop": stop_iso,
-                "duration": duration_sec,
-                "project_id": None,
-                "project_name": project,
-                "workspace_id": None,
-                "tags": tags,
-                "tag_ids": [],
-                "billable": row.get("Billable", "No") == "Yes",
-                "at": "",
-                "task_id": None,
-                "task_name": "",
-                "client_name": "",
-                "user_id": None,
-            })
-
+        # Decoded line by line as the reader advances, never as one big str
+        lines = io.TextIOWrapper(io.BytesIO(csv_bytes), encoding="utf-8-sig", newline="")
+        entries = _parse_csv_entries(lines)
         print(f"  {year}: parsed {len(entries)} entries from CSV")
         return entries
 
@@ -591,6 +755,7 @@ class TogglClient:
 
         Uses multiple API calls (50 entries/page) — budget ~N/50 calls per year.
         Only call this during the enrichment sync window while on Premium.
+        Without tag_map, the client's cached tag_map() resolves tag names.
         """
         today = date.today()
         end = f"{year}-12-31" if year < today.year else today.isoformat()
@@ -603,7 +768,7 @@ class TogglClient:
 
         entries = self._flatten_report_entries(
             rows,
-            tag_map=tag_map,
+            tag_map=tag_map if tag_map is not None else self.tag_map(wid),
             task_map=task_map,
             client_map=client_map,
             workspace_id=wid,